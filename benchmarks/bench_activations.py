@@ -0,0 +1,74 @@
+"""
+Compares sequence generation with activation tracking done while the
+events are emitted against the previous two-pass approach (render all
+lines, then filter_deactivations over the rendered text).
+
+Usage:
+    python -m benchmarks.bench_activations [--activations 100000] [--repeat 5]
+"""
+import argparse
+import random
+
+from benchmarks.timing import best_of
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+from sequence.mermaid_sequence_generator import MermaidSequenceGenerator, FormattedNames
+
+
+def activation_diagram(activations: int, depth: int = 3, seed: int = 0) -> str:
+    """
+    Returns a sequence diagram with `activations` activate/deactivate pairs,
+    unmatched deactivations and messages, spread over nested alt/loop/par blocks.
+    """
+    rnd = random.Random(seed)
+    names = [f"P{i}" for i in range(12)]
+    lines = ["@startuml"]
+    stack = []
+    for i in range(activations):
+        a, b = rnd.choice(names), rnd.choice(names)
+        lines.append(f"{a} -> {b}: call {i}")
+        lines.append(f"activate {b}")
+        lines.append(f"deactivate {rnd.choice(names)}")
+        kind = rnd.randrange(8)
+        if kind == 0 and len(stack) < depth:
+            block = rnd.choice(("alt", "loop", "par"))
+            stack.append(block)
+            lines.append(f"{block} condition {i}")
+        elif kind == 1 and stack and stack[-1] != "loop":
+            lines.append(("else" if stack[-1] == "alt" else "and") + f" branch {i}")
+        elif kind == 2 and stack:
+            stack.pop()
+            lines.append("end")
+    lines.extend("end" for _ in stack)
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def two_pass(generator: MermaidSequenceGenerator, diagram):
+    rendered = generator.process_events(diagram.events, FormattedNames())
+    return list(generator.filter_deactivations(rendered))
+
+
+def one_pass(generator: MermaidSequenceGenerator, diagram):
+    return list(generator.iter_events(diagram.events, FormattedNames(), active={}))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--activations", type=int, default=100000, help="number of activate statements")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    diagram = PlantUMLSequenceParser().parse(activation_diagram(args.activations, seed=args.seed))
+    generator = MermaidSequenceGenerator()
+    assert one_pass(generator, diagram) == two_pass(generator, diagram), "outputs differ"
+
+    timings = {}
+    for name, func in (("two-pass", two_pass), ("one-pass", one_pass)):
+        timings[name] = best_of(args.repeat, lambda: func(generator, diagram))
+    for name, best in timings.items():
+        print(f"{name}: {best * 1000:.1f} ms ({timings['two-pass'] / best:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measures the server time of Streamlit reruns of streamlit_app with the
+local AppTest harness: several sessions each paste a diagram, convert it
+and then rerun the script repeatedly (as every widget interaction does).
+The time is taken around main() inside the script run, since the wall time
+of AppTest.run() is dominated by the harness polling for results.
+
+Usage:
+    python -m benchmarks.bench_app_rerun [--sessions 4] [--reruns 50]
+"""
+import argparse
+import statistics
+
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.synthetic import sequence_diagram
+
+
+def timed_app():
+    # AppTest runs the source of this function as the app script
+    import time
+    import streamlit as st
+    import streamlit_app
+    start = time.perf_counter()
+    streamlit_app.main()
+    st.session_state.setdefault("rerun_seconds", []).append(time.perf_counter() - start)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--sessions", type=int, default=4, help="number of app sessions")
+    arg_parser.add_argument("--reruns", type=int, default=50, help="timed reruns per session")
+    args = arg_parser.parse_args()
+    # AppTest runs without a server; silence the warnings this produces
+    set_log_level("error")
+
+    plantuml_code = sequence_diagram(50)
+    sessions = []
+    for _ in range(args.sessions):
+        app = AppTest.from_function(timed_app, default_timeout=60)
+        app.run()
+        app.sidebar.selectbox[0].select("🔄 Sequence").run()
+        app.text_area[0].input(plantuml_code).run()
+        app.button[0].click().run()
+        assert not app.exception, app.exception
+        sessions.append(app)
+
+    for _ in range(args.reruns):
+        for app in sessions:
+            app.run()
+    timings = sorted(t for app in sessions for t in app.session_state["rerun_seconds"][-args.reruns:])
+    print(
+        f"{len(timings)} reruns: mean {statistics.mean(timings) * 1000:.2f} ms, "
+        f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compares PlantUMLClassParser with the previous sequential regex loop
+(kept below as the reference) in lines per second, and checks that both
+produce identical models on the same corpus.
+
+Usage:
+    python -m benchmarks.bench_class_parser [--size 20000] [--repeat 5] [--seeds 5]
+"""
+import argparse
+import re
+
+from benchmarks.synthetic import class_diagram
+from benchmarks.timing import best_of
+from classes.plantuml_class_parser import PlantUMLClassParser
+from core.diagram_model import ClassDiagram, ClassEntity, ClassRelationship
+
+LEGACY_CARD_ASSOC_RE = re.compile(
+    r'^(\w+)(?:\s+"([^"]+)")?\s+([o*\-\>]+)\s+(?:"([^"]+)"\s+)?(\w+)(?:\s*:\s*(.+))?$',
+    re.IGNORECASE
+)
+LEGACY_IMPL_ARROW_RE = re.compile(r'^(\w+)\s+<\|..\s+(\w+)(?:\s*:\s*(.+))?$', re.IGNORECASE)
+
+
+def legacy_parse(plantuml: str) -> ClassDiagram:
+    """
+    The parser before the single-dispatch rewrite, kept as the reference:
+    every line is tried against each pattern in turn, most of them passed
+    to re.match as strings. Unparsed lines were printed; that is left out.
+    """
+    lines = [line.strip() for line in plantuml.splitlines() if line.strip() and not line.strip().startswith('@')]
+    entities = {}
+    relationships = []
+
+    def ensure(name, typ="class"):
+        if name not in entities:
+            entities[name] = ClassEntity(name=name, type=typ, body="")
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        m_block = re.match(r'^(class|interface)\s+(\w+)\s*\{$', line, re.IGNORECASE)
+        if m_block:
+            typ, name = m_block.groups()
+            body_lines = []
+            i += 1
+            while i < len(lines) and lines[i] != '}':
+                body_lines.append(lines[i])
+                i += 1
+            entities[name] = ClassEntity(name=name, type=typ.lower(), body="\n".join(body_lines))
+            i += 1
+            continue
+        m_inline = re.match(r'^(class|interface)\s+(\w+)$', line, re.IGNORECASE)
+        if m_inline:
+            typ, name = m_inline.groups()
+            entities[name] = ClassEntity(name=name, type=typ.lower(), body="")
+        elif LEGACY_CARD_ASSOC_RE.match(line):
+            source, source_card, arrow, target_card, target, label = LEGACY_CARD_ASSOC_RE.match(line).groups()
+            relationships.append(ClassRelationship(
+                source=source, target=target, relation="association", label=label or "",
+                source_cardinality=source_card or "", target_cardinality=target_card or "", arrow=arrow or ""
+            ))
+            ensure(source)
+            ensure(target)
+        elif re.match(r'^(\w+)\s+<\|--\s+(\w+)(?:\s*:\s*(.+))?$', line):
+            parent, child, label = re.match(r'^(\w+)\s+<\|--\s+(\w+)(?:\s*:\s*(.+))?$', line).groups()
+            relationships.append(ClassRelationship(source=child, target=parent, relation="extends", label=label or ""))
+            ensure(child)
+            ensure(parent)
+        elif LEGACY_IMPL_ARROW_RE.match(line):
+            interface, impl_class, label = LEGACY_IMPL_ARROW_RE.match(line).groups()
+            relationships.append(ClassRelationship(source=impl_class, target=interface, relation="implements",
+                                                   label=label or ""))
+            ensure(impl_class)
+            ensure(interface, "interface")
+        else:
+            for pattern, relation in (
+                (r'^(\w+)\s+(extends|implements)\s+(\w+)(?:\s*:\s*(.+))?$', None),
+                (r'^(\w+)\s+-->\s+(\w+)(?:\s*:\s*(.+))?$', "association"),
+                (r'^(\w+)\s+\.\.>\s+(\w+)(?:\s*:\s*(.+))?$', "dependency"),
+            ):
+                m_rel = re.match(pattern, line, re.IGNORECASE if relation is None else 0)
+                if m_rel:
+                    if relation is None:
+                        source, rel_type, target, label = m_rel.groups()
+                        relation = rel_type.lower()
+                    else:
+                        source, target, label = m_rel.groups()
+                    relationships.append(ClassRelationship(source=source, target=target, relation=relation,
+                                                           label=label or ""))
+                    ensure(source)
+                    ensure(target)
+                    break
+        i += 1
+    return ClassDiagram(entities=list(entities.values()), relationships=relationships)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=20000, help="number of statements")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--seeds", type=int, default=5, help="diagrams compared with the reference")
+    args = arg_parser.parse_args()
+
+    parser = PlantUMLClassParser()
+    for seed in range(args.seed, args.seed + args.seeds):
+        sample = class_diagram(args.size // 10, seed)
+        assert parser.parse(sample) == legacy_parse(sample), f"model differs from the reference (seed {seed})"
+
+    text = class_diagram(args.size, args.seed)
+    assert parser.parse(text) == legacy_parse(text), "model differs from the reference"
+    line_count = text.count("\n") + 1
+    timings = {
+        "legacy loop": best_of(args.repeat, lambda: legacy_parse(text)),
+        "parser": best_of(args.repeat, lambda: parser.parse(text)),
+    }
+    baseline = timings["legacy loop"]
+    for name, elapsed in timings.items():
+        print(f"{name:>11}: {elapsed * 1000:7.1f} ms, {line_count / elapsed:,.0f} lines/sec, x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
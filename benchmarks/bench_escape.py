@@ -0,0 +1,71 @@
+"""
+Compares BaseMermaidGenerator.escape_text and escape_many with the previous
+replace chain on a corpus of realistic labels, and checks that the outputs
+are byte-identical.
+
+Usage:
+    python -m benchmarks.bench_escape [--size 10000] [--repeat 5]
+"""
+import argparse
+import random
+
+from benchmarks.timing import best_of
+from core.base_mermaid_generator import BaseMermaidGenerator
+
+WORDS = ("request", "response", "user", "token", "id", "status", "order", "cart",
+         "retry", "timeout", "payload", "cache", "session", "validate", "commit")
+DECORATIONS = (
+    lambda w: w,
+    lambda w: f"{w}()",
+    lambda w: f"{w}(id, token)",
+    lambda w: f"{w}; {w}",
+    lambda w: f"{w} & {w}",
+    lambda w: f"{w}\\n{w}",
+    lambda w: f"{w}\n{w}",
+    lambda w: f"[{w} == null]",
+)
+
+
+def legacy_escape_text(text: str) -> str:
+    """The replace chain escape_text used before, kept as the reference."""
+    safe = text.replace("&", "&amp;")
+    safe = safe.replace(";", "#59;")
+    safe = safe.replace("\\n", "<br>").replace("\n", "<br>")
+    safe = safe.replace("(", "#40;").replace(")", "#41;")
+    return safe
+
+
+def label_corpus(size: int, seed: int = 0):
+    rnd = random.Random(seed)
+    return [
+        " ".join(rnd.choice(DECORATIONS)(rnd.choice(WORDS)) for _ in range(rnd.randint(1, 4)))
+        for _ in range(size)
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=10000, help="number of labels")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    labels = label_corpus(args.size, args.seed)
+    expected = [legacy_escape_text(label) for label in labels]
+    escape_text = BaseMermaidGenerator.escape_text
+    assert [escape_text(label) for label in labels] == expected, "escape_text output differs"
+    assert BaseMermaidGenerator.escape_many(labels) == expected, "escape_many output differs"
+
+    timings = {
+        "legacy chain": best_of(args.repeat, lambda: [legacy_escape_text(label) for label in labels]),
+        "escape_text": best_of(args.repeat, lambda: [escape_text(label) for label in labels]),
+        "escape_many": best_of(args.repeat, lambda: BaseMermaidGenerator.escape_many(labels)),
+    }
+    baseline = timings["legacy chain"]
+    for name, elapsed in timings.items():
+        print(f"{name:>12}: {elapsed * 1000:7.2f} ms, {len(labels) / elapsed:,.0f} labels/sec, "
+              f"x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
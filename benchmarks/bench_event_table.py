@@ -0,0 +1,37 @@
+"""
+Compares the object model of sequence events with the columnar EventTable:
+memory retained after parsing and Mermaid generation time.
+
+Usage:
+    python -m benchmarks.bench_event_table [--size 500000] [--repeat 3]
+"""
+import argparse
+
+from benchmarks.bench_model_memory import retained_bytes
+from benchmarks.synthetic import sequence_diagram
+from benchmarks.timing import best_of
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+from sequence.mermaid_sequence_generator import MermaidSequenceGenerator
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=500000, help="number of statements")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    text = sequence_diagram(args.size, seed=args.seed)
+    generator = MermaidSequenceGenerator()
+    outputs = {}
+    for name, columnar in (("objects", False), ("columnar", True)):
+        parser = PlantUMLSequenceParser(columnar=columnar)
+        diagram, size = retained_bytes(parser.parse, text)
+        best = best_of(args.repeat, lambda: generator.generate(diagram))
+        outputs[name] = generator.generate(diagram)
+        print(f"{name:>8}: model {size / 2**20:7.1f} MiB, generate {best * 1000:7.1f} ms")
+    assert outputs["objects"] == outputs["columnar"], "outputs differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Load test of the HTTP conversion service (cli.http_service) on localhost:
+concurrent keep-alive clients send single or batch conversion requests
+and the script reports p50/p99 latency and throughput.
+
+Without --port a service is started in a subprocess on a free port with
+its conversion cache disabled (so every request really converts), and
+stopped at the end.
+
+Usage:
+    python -m benchmarks.bench_http_service [--requests 2000] [--concurrency 32]
+                                            [--batch 0] [--size 100] [--workers 4]
+    python -m benchmarks.bench_http_service --port 8000   # an already running service
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+
+
+def request_bodies(count: int, batch: int, size: int) -> list:
+    """Distinct diagrams (seeded), rotating over the diagram types."""
+    makers = (
+        ("components", lambda seed: component_diagram(size, seed)),
+        ("class", lambda seed: class_diagram(size, seed)),
+        ("sequence", lambda seed: sequence_diagram(size, seed=seed)),
+    )
+    diagrams = []
+    for seed in range(count * max(1, batch)):
+        kind, make = makers[seed % len(makers)]
+        diagrams.append({"id": str(seed), "type": kind, "plantuml": make(seed)})
+    if batch == 0:
+        return [("/convert", json.dumps(d).encode("utf-8")) for d in diagrams]
+    return [
+        ("/convert/batch", json.dumps({"diagrams": diagrams[i:i + batch]}).encode("utf-8"))
+        for i in range(0, len(diagrams), batch)
+    ]
+
+
+async def post(reader, writer, host: str, path: str, body: bytes) -> int:
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host: str, port: int, queue: asyncio.Queue, latencies: list, failures: list):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while not queue.empty():
+            path, body = queue.get_nowait()
+            start = time.perf_counter()
+            status = await post(reader, writer, host, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, bodies: list, concurrency: int):
+    queue = asyncio.Queue()
+    for item in bodies:
+        queue.put_nowait(item)
+    latencies = []
+    failures = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, queue, latencies, failures) for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), failures
+
+
+def start_service(workers: int):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "cli.http_service", "--port", "0", "--workers", str(workers),
+         "--cache-entries", "0"],
+        stdout=subprocess.PIPE, text=True
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Listening on"):
+        process.kill()
+        sys.exit(f"the service did not start: {line!r}")
+    host, port = line.rsplit("/", 1)[1].strip().rsplit(":", 1)
+    return process, host, int(port)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, help="port of a running service (default: start one)")
+    arg_parser.add_argument("--workers", type=int, default=4, help="pool size of the started service")
+    arg_parser.add_argument("--requests", type=int, default=2000, help="number of HTTP requests")
+    arg_parser.add_argument("--concurrency", type=int, default=32, help="number of concurrent connections")
+    arg_parser.add_argument("--batch", type=int, default=0,
+                            help="diagrams per request via /convert/batch (0: single /convert requests)")
+    arg_parser.add_argument("--size", type=int, default=100, help="statements per diagram")
+    args = arg_parser.parse_args()
+
+    bodies = request_bodies(args.requests, args.batch, args.size)
+    process = None
+    host, port = args.host, args.port
+    if port is None:
+        process, host, port = start_service(args.workers)
+    try:
+        elapsed, latencies, failures = asyncio.run(load_test(host, port, bodies, args.concurrency))
+    finally:
+        if process is not None:
+            # SIGTERM: the service shuts its worker pool down before exiting
+            process.terminate()
+            process.wait()
+
+    diagrams = len(bodies) * max(1, args.batch)
+    print(f"{len(bodies)} requests ({diagrams} diagrams), concurrency {args.concurrency}, "
+          f"{len(failures)} failed")
+    print(f"latency: mean {statistics.mean(latencies) * 1000:.2f} ms, "
+          f"p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:.2f} ms")
+    print(f"throughput: {len(bodies) / elapsed:,.0f} requests/sec, {diagrams / elapsed:,.0f} diagrams/sec")
+
+
+if __name__ == "__main__":
+    main()
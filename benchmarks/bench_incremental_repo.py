@@ -0,0 +1,78 @@
+"""
+Measures incremental repository conversion (cli.batch_convert --manifest)
+on a generated tree of PlantUML files: a full first run, a no-op run, and
+a run after touching, editing and deleting a few files. Checks that only
+the edited files are converted and that outputs of deleted files are removed.
+
+Usage:
+    python -m benchmarks.bench_incremental_repo [--files 10000] [--changes 10] [-j 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from cli import batch_convert
+
+MAKERS = (
+    lambda seed: component_diagram(10, seed),
+    lambda seed: class_diagram(10, seed),
+    lambda seed: sequence_diagram(10, seed=seed),
+)
+
+
+def timed_run(argv) -> tuple:
+    """Runs the batch converter quietly; returns (seconds, its summary lines)."""
+    out = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(out):
+        batch_convert.main(argv)
+    return time.perf_counter() - start, out.getvalue().strip().splitlines()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=10000)
+    arg_parser.add_argument("--changes", type=int, default=10, help="files touched, edited and deleted each")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp, "repo")
+        sources = []
+        for i in range(args.files):
+            path = root / f"module{i % 100}" / f"diagram{i}.puml"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(MAKERS[i % 3](i), encoding="utf-8")
+            sources.append(path)
+        argv = [str(root), "-j", str(args.jobs), "--manifest", str(Path(tmp, "manifest.json"))]
+
+        for label in ("full", "no-op"):
+            elapsed, summary = timed_run(argv)
+            print(f"{label:>12}: {elapsed:6.2f} s | {' | '.join(summary)}")
+
+        changed = sources[:args.changes * 3]
+        touched, edited, deleted = (changed[i::3] for i in range(3))
+        for path in touched:
+            # Same content, new mtime: hashed, but not converted
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        for path in edited:
+            path.write_text(path.read_text(encoding="utf-8").replace("@enduml", "A -> B: edited\n@enduml"),
+                            encoding="utf-8")
+        for path in deleted:
+            path.unlink()
+        elapsed, summary = timed_run(argv)
+        print(f"{'incremental':>12}: {elapsed:6.2f} s | {' | '.join(summary)}")
+
+        assert all("edited" in path.with_suffix(".mmd").read_text(encoding="utf-8") for path in edited)
+        assert not any(path.with_suffix(".mmd").exists() for path in deleted)
+        elapsed, summary = timed_run(argv)
+        print(f"{'no-op':>12}: {elapsed:6.2f} s | {' | '.join(summary)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measures the memory retained by parsed diagram models with tracemalloc
+and reports it in bytes per event (message, note, activation or block),
+for the slotted model classes and for __dict__-based copies of them (the
+models before __slots__), built by the same parsers from the same text.
+
+Usage:
+    python -m benchmarks.bench_model_memory [--size 100000]
+"""
+import argparse
+import contextlib
+import dataclasses
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from classes.plantuml_class_parser import PlantUMLClassParser
+from components.plantuml_components_parser import PlantUMLComponentParser
+from core.sequence_model import AltBlock, LoopBlock, ParBlock
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+
+
+def count_events(events) -> int:
+    total = 0
+    stack = [events]
+    while stack:
+        for ev in stack.pop():
+            total += 1
+            if isinstance(ev, AltBlock):
+                stack.extend(branch for _, branch in ev.alternatives)
+            elif isinstance(ev, ParBlock):
+                stack.extend(branch for _, branch in ev.branches)
+            elif isinstance(ev, LoopBlock):
+                stack.append(ev.events)
+    return total
+
+
+def dict_based(cls):
+    """A plain dataclass with the fields of the slotted model class: instances get a __dict__."""
+    return dataclasses.make_dataclass(cls.__name__, [
+        (f.name, f.type, dataclasses.field(default=f.default, default_factory=f.default_factory))
+        for f in dataclasses.fields(cls)
+    ])
+
+
+@contextlib.contextmanager
+def dict_based_models(parser_class):
+    """Makes the parser's module build __dict__-based copies of its slotted model classes."""
+    module = vars(sys.modules[parser_class.__module__])
+    originals = {
+        name: obj for name, obj in module.items()
+        if isinstance(obj, type) and dataclasses.is_dataclass(obj) and "__slots__" in vars(obj)
+    }
+    module.update({name: dict_based(cls) for name, cls in originals.items()})
+    try:
+        yield
+    finally:
+        module.update(originals)
+
+
+def retained_bytes(parse, text: str):
+    """Returns (model, bytes still allocated after parse(text) returned)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        model = parse(text)
+        return model, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def compare(parser_class, text: str, count):
+    """Returns (count(model), retained bytes of the slotted model, of the __dict__-based model)."""
+    # Warm-up: one-time allocations of the first parse are not part of the model
+    parser_class().parse(text)
+    model, slotted_size = retained_bytes(parser_class().parse, text)
+    items = count(model)
+    # Interned identifiers of a live model would be reused by the second parse
+    del model
+    with dict_based_models(parser_class):
+        _, dict_size = retained_bytes(parser_class().parse, text)
+    return items, slotted_size, dict_size
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=100000, help="number of statements")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args()
+
+    text = sequence_diagram(args.size, seed=args.seed)
+    events, size, dict_size = compare(PlantUMLSequenceParser, text, lambda diagram: count_events(diagram.events))
+    print(f"sequence:   {events} events, {size / events:6.1f} bytes/event, "
+          f"__dict__: {dict_size / events:6.1f} (source text: {len(text) / events:.1f} bytes/event)")
+
+    text = component_diagram(args.size, seed=args.seed)
+    items, size, dict_size = compare(PlantUMLComponentParser, text,
+                                     lambda diagram: len(diagram.components) + len(diagram.edges))
+    print(f"components: {items} items,  {size / items:6.1f} bytes/item,  __dict__: {dict_size / items:6.1f}")
+
+    text = class_diagram(args.size, seed=args.seed)
+    items, size, dict_size = compare(PlantUMLClassParser, text,
+                                     lambda diagram: len(diagram.entities) + len(diagram.relationships))
+    print(f"class:      {items} items,  {size / items:6.1f} bytes/item,  __dict__: {dict_size / items:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures PlantUML URL encoding on large diagrams: the table-driven encode64
+against the previous byte-by-byte loop, and encode_plantuml with a cold
+and a warm cache. Also checks the encode/decode round trip.
+
+Usage:
+    python -m benchmarks.bench_plantuml_encode [--megabytes 1] [--repeat 5]
+"""
+import argparse
+import zlib
+
+from benchmarks.synthetic import sequence_diagram
+from benchmarks.timing import best_of
+from viewer import zoomable
+from viewer.zoomable import decode_plantuml, encode64, encode_plantuml
+
+LEGACY_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_"
+
+
+def legacy_encode64(data: bytes) -> str:
+    """The byte-by-byte loop encode64 used before, kept as the reference."""
+    res = []
+    for i in range(0, len(data), 3):
+        chunk = data[i:i + 3] + bytes(3 - len(data[i:i + 3]))
+        b1, b2, b3 = chunk
+        res.append(LEGACY_ALPHABET[b1 >> 2])
+        res.append(LEGACY_ALPHABET[((b1 & 0x3) << 4) | (b2 >> 4)])
+        res.append(LEGACY_ALPHABET[((b2 & 0xF) << 2) | (b3 >> 6)])
+        res.append(LEGACY_ALPHABET[b3 & 0x3F])
+    return "".join(res)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--megabytes", type=float, default=1.0, help="size of the diagram text")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = arg_parser.parse_args()
+
+    text = ""
+    size = 1000
+    while len(text) < args.megabytes * 2**20:
+        size *= 2
+        text = sequence_diagram(size)
+    text = text[:int(args.megabytes * 2**20)]
+    compressed = zlib.compress(text.encode("utf-8"))[2:-4]
+
+    assert encode64(compressed) == legacy_encode64(compressed), "encode64 output differs"
+    assert decode_plantuml(encode_plantuml(text)) == text, "round trip failed"
+
+    def cold():
+        zoomable._encode_cache.clear()  # pylint: disable=protected-access
+        encode_plantuml(text)
+
+    legacy = best_of(args.repeat, lambda: legacy_encode64(compressed))
+    table = best_of(args.repeat, lambda: encode64(compressed))
+    print(f"text: {len(text) / 2**20:.2f} MiB, deflated: {len(compressed) / 1024:.0f} KiB")
+    print(f"encode64 legacy loop:     {legacy * 1000:8.2f} ms")
+    print(f"encode64 table:           {table * 1000:8.2f} ms ({legacy / table:,.0f}x)")
+    print(f"encode_plantuml cold:     {best_of(args.repeat, cold) * 1000:8.2f} ms")
+    print(f"encode_plantuml memoized: {best_of(args.repeat, lambda: encode_plantuml(text)) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures the script loading cost of diagram preview pages for each asset
+mode (see viewer.assets). Every preview is a fresh iframe, so the page is
+"loaded" --previews times by a client that, like a browser, keeps responses
+in its HTTP cache while their Cache-Control max-age is fresh.
+Reports the first and the average following load time and the bytes fetched.
+The in-page load time is also logged to the browser console by the preview
+itself (see viewer.zoomable.LOAD_TIME_SCRIPT).
+
+Usage:
+    python -m benchmarks.bench_preview_load [--previews 20] [--mode local] [--mode cdn]
+"""
+import argparse
+import re
+import time
+import urllib.error
+import urllib.request
+
+from viewer.assets import CDN_MODE, LOCAL_MODE, asset_urls
+from viewer.zoomable import zoomable_mermaid_html
+
+SCRIPT_SRC_RE = re.compile(r'<script src="([^"]+)"')
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class CachingClient:
+    """Minimal HTTP cache: a fresh cached response is served without a request."""
+
+    def __init__(self):
+        self._cache = {}
+        self.bytes_fetched = 0
+
+    def get(self, url: str):
+        cached = self._cache.get(url)
+        if cached is not None and cached[0] > time.monotonic():
+            return
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+            max_age = MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        self.bytes_fetched += len(data)
+        if max_age:
+            self._cache[url] = (time.monotonic() + int(max_age.group(1)), data)
+
+
+def load_previews(mode: str, previews: int):
+    assets = asset_urls(mode)
+    client = CachingClient()
+    timings = []
+    for i in range(previews):
+        start = time.perf_counter()
+        page = zoomable_mermaid_html(f"flowchart LR\nA{i} --> B", "mermaid-container", 500, assets)
+        for url in SCRIPT_SRC_RE.findall(page):
+            client.get(url)
+        timings.append(time.perf_counter() - start)
+    return timings, client.bytes_fetched
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--previews", type=int, default=20, help="number of preview loads")
+    arg_parser.add_argument("--mode", action="append", choices=(CDN_MODE, LOCAL_MODE), dest="modes",
+                            help="asset mode to measure (default: both)")
+    args = arg_parser.parse_args()
+
+    for mode in args.modes or (LOCAL_MODE, CDN_MODE):
+        try:
+            timings, fetched = load_previews(mode, args.previews)
+        except (OSError, urllib.error.URLError) as e:
+            print(f"{mode:>5}: skipped ({e})")
+            continue
+        following = timings[1:] or timings
+        print(
+            f"{mode:>5}: first load {timings[0] * 1000:8.1f} ms, "
+            f"next loads {sum(following) / len(following) * 1000:6.2f} ms avg, "
+            f"{fetched / 1024:,.0f} KiB fetched for {args.previews} previews"
+        )
+
+
+if __name__ == "__main__":
+    main()
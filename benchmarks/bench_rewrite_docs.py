@@ -0,0 +1,59 @@
+"""
+Measures cli.rewrite_docs on a generated docs tree: Markdown and AsciiDoc
+documents with several embedded PlantUML blocks each. Runs a cold pass
+and a second pass over the same sources with a warm --cache, both into
+an --output-dir, and reports blocks/sec of each.
+
+Usage:
+    python -m benchmarks.bench_rewrite_docs [--documents 2000] [--blocks 5] [--size 30] [-j 4]
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from cli import rewrite_docs
+
+MAKERS = (
+    lambda size, seed: component_diagram(size, seed),
+    lambda size, seed: class_diagram(size, seed),
+    lambda size, seed: sequence_diagram(size, seed=seed),
+)
+
+
+def write_tree(root: Path, documents: int, blocks: int, size: int):
+    for doc in range(documents):
+        directory = root / f"section{doc % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        markdown = doc % 4 != 0
+        parts = [f"# Document {doc}\n" if markdown else f"= Document {doc}\n"]
+        for block in range(blocks):
+            seed = doc * blocks + block
+            diagram = MAKERS[seed % len(MAKERS)](size, seed)
+            parts.append(f"\nParagraph {block} describing the diagram below.\n\n")
+            if markdown:
+                parts.append(f"```plantuml\n{diagram}\n```\n")
+            else:
+                parts.append(f"[plantuml]\n----\n{diagram}\n----\n")
+        (directory / f"doc{doc}.{'md' if markdown else 'adoc'}").write_text("".join(parts), encoding="utf-8")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--documents", type=int, default=2000)
+    arg_parser.add_argument("--blocks", type=int, default=5, help="PlantUML blocks per document")
+    arg_parser.add_argument("--size", type=int, default=30, help="statements per diagram")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=4)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs, cache = Path(tmp, "docs"), Path(tmp, "cache.sqlite")
+        write_tree(docs, args.documents, args.blocks, args.size)
+        for label in ("cold", "cached"):
+            print(f"{label}: ", end="", flush=True)
+            rewrite_docs.main([str(docs), "-o", str(Path(tmp, label)), "-j", str(args.jobs),
+                               "--cache", str(cache)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Times every conversion stage (parse, generate, escape_text, encode_plantuml)
+on seeded synthetic diagrams of each type, writes the results as JSON and
+optionally compares them with a stored baseline to catch regressions.
+
+Nesting depth applies to sequence diagrams only: the component and class
+parsers have no nested constructs.
+
+Usage:
+    python -m benchmarks.bench_suite [--sizes 1000,10000] [--depth 3] [--repeat 5]
+                                     [--output results.json]
+                                     [--baseline baseline.json] [--tolerance 0.25]
+The exit status is 1 if any stage is slower than the baseline by more
+than the tolerance (a fraction of the baseline time).
+"""
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from benchmarks.timing import best_of
+from core.base_mermaid_generator import BaseMermaidGenerator
+from core.converters import CONVERTER_VERSION, DIAGRAM_TYPES, get_converter
+from core.sequence_table import EventTable
+from viewer import zoomable
+from viewer.zoomable import encode_plantuml
+
+STAGES = ("parse", "generate", "escape_text", "encode_plantuml")
+
+
+def component_labels(diagram) -> list:
+    return ([comp.label for comp in diagram.components]
+            + [edge.label for edge in diagram.edges if edge.label])
+
+
+def class_labels(diagram) -> list:
+    return [rel.label for rel in diagram.relationships if rel.label]
+
+
+def sequence_labels(diagram) -> list:
+    # Message and note texts and block labels, in output order
+    return EventTable.from_events(diagram.events).strings
+
+
+CASES = {
+    "components": (lambda size, depth, seed: component_diagram(size, seed), component_labels),
+    "class": (lambda size, depth, seed: class_diagram(size, seed), class_labels),
+    "sequence": (sequence_diagram, sequence_labels),
+}
+
+
+def run_case(kind: str, size: int, depth: int, seed: int, repeat: int) -> dict:
+    make_text, collect_labels = CASES[kind]
+    text = make_text(size, depth, seed)
+    parser, generator = get_converter(kind)
+    diagram = parser.parse(text)
+    labels = collect_labels(diagram)
+    escape_text = BaseMermaidGenerator.escape_text
+
+    def encode_cold():
+        zoomable._encode_cache.clear()  # pylint: disable=protected-access
+        encode_plantuml(text)
+
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "labels": len(labels),
+        "parse": best_of(repeat, lambda: parser.parse(text)),
+        "generate": best_of(repeat, lambda: generator.generate(diagram)),
+        "escape_text": best_of(repeat, lambda: [escape_text(label) for label in labels]),
+        "encode_plantuml": best_of(repeat, encode_cold),
+    }
+
+
+def run_suite(sizes, depth: int, seed: int, repeat: int) -> dict:
+    results = {}
+    for kind in DIAGRAM_TYPES:
+        for size in sizes:
+            results[f"{kind}/{size}"] = run_case(kind, size, depth, seed, repeat)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "converter_version": CONVERTER_VERSION,
+            "depth": depth,
+            "seed": seed,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Returns (case, stage, baseline seconds, current seconds) of every regression."""
+    regressions = []
+    for case, timings in report["results"].items():
+        reference = baseline["results"].get(case)
+        if reference is None:
+            continue
+        for stage in STAGES:
+            if stage in reference and timings[stage] > reference[stage] * (1 + tolerance):
+                regressions.append((case, stage, reference[stage], timings[stage]))
+    return regressions
+
+
+def print_report(report: dict, baseline: dict = None):
+    print(f"{'case':>17} " + " ".join(f"{stage:>16}" for stage in STAGES))
+    for case, timings in report["results"].items():
+        reference = (baseline or {}).get("results", {}).get(case, {})
+        cells = []
+        for stage in STAGES:
+            cell = f"{timings[stage] * 1000:.2f} ms"
+            if stage in reference:
+                cell += f" x{reference[stage] / timings[stage]:.2f}"
+            cells.append(f"{cell:>16}")
+        print(f"{case:>17} " + " ".join(cells))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--sizes", default="1000,10000", help="comma-separated diagram sizes in statements")
+    arg_parser.add_argument("--depth", type=int, default=3, help="maximum nesting of sequence blocks")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    arg_parser.add_argument("--output", help="write the results to this JSON file")
+    arg_parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="allowed slowdown against the baseline, as a fraction")
+    args = arg_parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = run_suite(sizes, args.depth, args.seed, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for case, stage, before, after in regressions:
+            print(f"REGRESSION {case} {stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
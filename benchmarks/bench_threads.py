@@ -0,0 +1,88 @@
+"""
+Concurrency stress check of core.converters.convert and of a shared
+ConversionCache: many threads convert the same seeded corpus at once
+(with a tiny thread switch interval to force interleaving), and every
+result must equal the single-threaded reference. tests/test_threads.py
+runs the same check with smaller counts on every push.
+
+Usage:
+    python -m benchmarks.bench_threads [--threads 32] [--rounds 2] [--diagrams 30] [--size 200]
+"""
+import argparse
+import sys
+import threading
+import time
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from core.conversion_cache import ConversionCache
+from core.converters import convert
+
+
+def corpus(size: int, count: int) -> list:
+    makers = (
+        ("components", lambda seed: component_diagram(size, seed)),
+        ("class", lambda seed: class_diagram(size, seed)),
+        ("sequence", lambda seed: sequence_diagram(size, seed=seed)),
+    )
+    return [(makers[i % 3][0], makers[i % 3][1](i)) for i in range(count)]
+
+
+def stress(threads: int, rounds: int, diagrams: list, expected: list, convert_func) -> tuple:
+    """Returns (elapsed seconds, number of results that differ from expected)."""
+    barrier = threading.Barrier(threads)
+    mismatches = []
+
+    def worker(offset: int):
+        barrier.wait()
+        for _ in range(rounds):
+            # Every thread walks the corpus from a different position
+            for i in range(len(diagrams)):
+                index = (i + offset) % len(diagrams)
+                kind, text = diagrams[index]
+                if convert_func(text, kind) != expected[index]:
+                    mismatches.append((kind, index))
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start, len(mismatches)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--threads", type=int, default=32)
+    arg_parser.add_argument("--rounds", type=int, default=2, help="passes over the corpus per thread")
+    arg_parser.add_argument("--diagrams", type=int, default=30, help="number of diagrams in the corpus")
+    arg_parser.add_argument("--size", type=int, default=200, help="statements per diagram")
+    args = arg_parser.parse_args()
+
+    diagrams = corpus(args.size, args.diagrams)
+    expected = [convert(text, kind) for kind, text in diagrams]
+    cache = ConversionCache(max_entries=args.diagrams // 2)  # smaller than the corpus: evictions race too
+
+    # Switch threads as often as possible to expose shared mutable state
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        results = {
+            "convert": stress(args.threads, args.rounds, diagrams, expected, convert),
+            "ConversionCache": stress(args.threads, args.rounds, diagrams, expected, cache.convert),
+        }
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    total = args.threads * args.rounds * len(diagrams)
+    failed = False
+    for name, (elapsed, mismatches) in results.items():
+        failed |= mismatches > 0
+        print(f"{name:>15}: {total} conversions in {args.threads} threads, {elapsed:.2f} s, "
+              f"{total / elapsed:,.0f}/sec, {mismatches} mismatches")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
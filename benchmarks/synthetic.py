@@ -0,0 +1,100 @@
+"""
+Seeded generators of synthetic PlantUML diagrams used by the benchmarks.
+"""
+import random
+
+
+def class_diagram(size: int, seed: int = 0) -> str:
+    """
+    Returns a class diagram with roughly `size` statements mixing class blocks,
+    inline declarations and every relationship form the class parser supports.
+    """
+    rnd = random.Random(seed)
+    names = [f"Class{i}" for i in range(max(2, size // 10))]
+    lines = ["@startuml"]
+    for _ in range(size):
+        a, b = rnd.choice(names), rnd.choice(names)
+        kind = rnd.randrange(9)
+        if kind == 0:
+            lines.append(f"class {a} {{")
+            lines.append("    +int id")
+            lines.append("    +String name")
+            lines.append("    +fun load(): Unit")
+            lines.append("}")
+        elif kind == 1:
+            lines.append(f"interface {a}")
+        elif kind == 2:
+            lines.append(f'{a} "1" --> "0..*" {b} : owns')
+        elif kind == 3:
+            lines.append(f"{a} <|-- {b}")
+        elif kind == 4:
+            lines.append(f"{a} <|.. {b}")
+        elif kind == 5:
+            lines.append(f"{a} extends {b}")
+        elif kind == 6:
+            lines.append(f"{a} --> {b} : uses")
+        elif kind == 7:
+            lines.append(f"{a} ..> {b} : depends")
+        else:
+            lines.append(f"{a} o-- {b}")
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def component_diagram(size: int, seed: int = 0) -> str:
+    """
+    Returns a component diagram with roughly `size` statements:
+    quoted and simple component declarations and labelled/unlabelled edges.
+    """
+    rnd = random.Random(seed)
+    names = [f"Comp{i}" for i in range(max(2, size // 10))]
+    lines = ["@startuml"]
+    for _ in range(size):
+        a, b = rnd.choice(names), rnd.choice(names)
+        kind = rnd.randrange(4)
+        if kind == 0:
+            lines.append(f'component "Service {a}\\n(Layer)" as {a}')
+        elif kind == 1:
+            lines.append(f"component {a}")
+        elif kind == 2:
+            lines.append(f"{a} --> {b} : calls (sync); retries")
+        else:
+            lines.append(f"{a} <-- {b}")
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def sequence_diagram(size: int, depth: int = 3, seed: int = 0) -> str:
+    """
+    Returns a sequence diagram with roughly `size` statements and alt/loop/par
+    blocks nested at most `depth` levels deep.
+    """
+    rnd = random.Random(seed)
+    names = [f"P{i}" for i in range(12)]
+    lines = ["@startuml", "actor User", 'participant "Mobile App" as App']
+    stack = []
+    for i in range(size):
+        a, b = rnd.choice(names), rnd.choice(names)
+        kind = rnd.randrange(12)
+        if kind < 6:
+            lines.append(f"{a} -> {b}: request {i} (id; retry)")
+        elif kind == 6:
+            lines.append(f"activate {b}")
+        elif kind == 7:
+            lines.append(f"deactivate {b}")
+        elif kind == 8:
+            lines.append(f"note over {a}: step {i}\\nsee docs")
+        elif kind == 9 and len(stack) < depth:
+            block = rnd.choice(("alt", "loop", "par"))
+            stack.append(block)
+            lines.append(f"{block} condition {i}")
+        elif kind == 10 and stack and stack[-1] != "loop":
+            lines.append(("else" if stack[-1] == "alt" else "and") + f" branch {i}")
+        elif stack:
+            stack.pop()
+            lines.append("end")
+        else:
+            lines.append(f"User -> App: tap {i}")
+    lines.extend("end" for _ in stack)
+    lines.append("@enduml")
+    return "\n".join(lines)
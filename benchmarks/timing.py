@@ -0,0 +1,14 @@
+"""
+Timing helpers shared by the benchmarks.
+"""
+import time
+
+
+def best_of(repeat: int, func) -> float:
+    """Runs func() `repeat` times and returns the fastest run in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -1,5 +1,6 @@
 # mermaid_class_generator.py
-from core.diagram_model import ClassDiagram
+from core.diagram_model import ClassDiagram, ClassEntity, ClassRelationship
+from core.diagram_generator import DiagramGenerator
 from core.base_mermaid_generator import BaseMermaidGenerator
 import re
 
@@ -14,69 +15,70 @@ def process_body_line(line: str) -> str:
     processed = re.sub(r"\)\s*:", ")", processed)
     return processed
 
-class MermaidClassGenerator(BaseMermaidGenerator):
-    def generate(self, diagram: ClassDiagram) -> str:
-        lines = ["classDiagram"]
+class MermaidClassGenerator(BaseMermaidGenerator, DiagramGenerator):
+    def iter_lines(self, diagram: ClassDiagram):
+        yield "classDiagram"
+        # Метки всех отношений экранируются одним вызовом escape_many
+        labels = self.escape_many(
+            rel.label.strip() for rel in diagram.relationships
+            if rel.label and rel.label.strip()
+        )
+        safe_labels = iter(labels)
         # Обрабатываем отношения между классами
         for rel in diagram.relationships:
-            relation_type = rel.relation.lower().strip()
+            has_label = bool(rel.label and rel.label.strip())
+            yield self.render_relationship(rel, next(safe_labels) if has_label else None)
+        # Обрабатываем определения классов и интерфейсов
+        for ent in diagram.entities:
+            yield from self.render_entity(ent)
+
+    def render_relationship(self, rel: ClassRelationship, safe_label: str = None) -> str:
+        relation_type = rel.relation.lower().strip()
+        # Экранируем метку через escape_text, если она не экранирована заранее
+        if safe_label is None:
             safe_label = (self.escape_text(rel.label.strip())
                           if rel.label and rel.label.strip() else "")
-            # Если заданы карточные метки – выводим строку с ними
-            if rel.source_cardinality or rel.target_cardinality:
-                if safe_label:
-                    lines.append(f'{rel.source} "{rel.source_cardinality}" {rel.arrow} "{rel.target_cardinality}" {rel.target} : {safe_label}')
-                else:
-                    lines.append(f'{rel.source} "{rel.source_cardinality}" {rel.arrow} "{rel.target_cardinality}" {rel.target}')
+        # Если заданы карточные метки – выводим строку с ними
+        if rel.source_cardinality or rel.target_cardinality:
+            if safe_label:
+                return f'{rel.source} "{rel.source_cardinality}" {rel.arrow} "{rel.target_cardinality}" {rel.target} : {safe_label}'
+            return f'{rel.source} "{rel.source_cardinality}" {rel.arrow} "{rel.target_cardinality}" {rel.target}'
+        if relation_type == "extends":
+            return f"{rel.target} <|-- {rel.source}"
+        if relation_type == "implements":
+            return f"{rel.target} <|.. {rel.source}"
+        if relation_type == "aggregation":
+            arrow = "o--"
+        elif relation_type == "composition":
+            arrow = "*--"
+        elif relation_type == "dependency":
+            arrow = "..>"
+        else:
+            # "association" и все остальные типы
+            arrow = "-->"
+        if safe_label:
+            return f"{rel.source} {arrow} {rel.target} : {safe_label}"
+        return f"{rel.source} {arrow} {rel.target}"
+
+    def render_entity(self, ent: ClassEntity) -> list:
+        lines = []
+        if ent.type.lower() == "interface":
+            if ent.body:
+                lines.append(f"class {ent.name} {{")
+                lines.append("    <<interface>>")
+                for body_line in ent.body.splitlines():
+                    processed_line = process_body_line(body_line)
+                    lines.append(f"    {processed_line}")
+                lines.append("}")
             else:
-                if relation_type == "extends":
-                    lines.append(f"{rel.target} <|-- {rel.source}")
-                elif relation_type == "implements":
-                    lines.append(f"{rel.target} <|.. {rel.source}")
-                elif relation_type == "aggregation":
-                    if safe_label:
-                        lines.append(f"{rel.source} o-- {rel.target} : {safe_label}")
-                    else:
-                        lines.append(f"{rel.source} o-- {rel.target}")
-                elif relation_type == "composition":
-                    if safe_label:
-                        lines.append(f"{rel.source} *-- {rel.target} : {safe_label}")
-                    else:
-                        lines.append(f"{rel.source} *-- {rel.target}")
-                elif relation_type == "dependency":
-                    if safe_label:
-                        lines.append(f"{rel.source} ..> {rel.target} : {safe_label}")
-                    else:
-                        lines.append(f"{rel.source} ..> {rel.target}")
-                elif relation_type == "association":
-                    if safe_label:
-                        lines.append(f"{rel.source} --> {rel.target} : {safe_label}")
-                    else:
-                        lines.append(f"{rel.source} --> {rel.target}")
-                else:
-                    if safe_label:
-                        lines.append(f"{rel.source} --> {rel.target} : {safe_label}")
-                    else:
-                        lines.append(f"{rel.source} --> {rel.target}")
-        # Обрабатываем определения классов и интерфейсов
-        for ent in diagram.entities:
-            if ent.type.lower() == "interface":
-                if ent.body:
-                    lines.append(f"class {ent.name} {{")
-                    lines.append("    <<interface>>")
-                    for body_line in ent.body.splitlines():
-                        processed_line = process_body_line(body_line)
-                        lines.append(f"    {processed_line}")
-                    lines.append("}")
-                else:
-                    lines.append(f"class {ent.name} <<interface>>")
+                lines.append(f"class {ent.name} <<interface>>")
+        else:
+            if ent.body:
+                lines.append(f"class {ent.name} {{")
+                for body_line in ent.body.splitlines():
+                    processed_line = process_body_line(body_line)
+                    lines.append(f"    {processed_line}")
+                lines.append("}")
             else:
-                if ent.body:
-                    lines.append(f"class {ent.name} {{")
-                    for body_line in ent.body.splitlines():
-                        processed_line = process_body_line(body_line)
-                        lines.append(f"    {processed_line}")
-                    lines.append("}")
-                else:
-                    lines.append(f"class {ent.name}")
-        return "\n".join(lines)
+                lines.append(f"class {ent.name}")
+        return lines
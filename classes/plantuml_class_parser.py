@@ -1,192 +1,226 @@
 import re
+from sys import intern
 from core.diagram_model import ClassDiagram, ClassEntity, ClassRelationship
-from core.diagram_parser import DiagramParser
+from core.diagram_parser import DiagramParser, clean_lines
+
+# Все шаблоны компилируются один раз при импорте модуля.
+# 1. Блочное определение класса или интерфейса: "class MyClass {"
+BLOCK_DECL_RE = re.compile(r'^(class|interface)\s+(\w+)\s*\{$', re.IGNORECASE)
+# 2. Inline-объявление класса или интерфейса: "class MyClass"
+INLINE_DECL_RE = re.compile(r'^(class|interface)\s+(\w+)$', re.IGNORECASE)
+# 3. Отношения с карточными метками, например: Customer "1" --> "0..*" Order : places
+CARD_ASSOC_RE = re.compile(
+    r'^(\w+)(?:\s+"([^"]+)")?\s+([o*\-\>]+)\s+(?:"([^"]+)"\s+)?(\w+)(?:\s*:\s*(.+))?$',
+    re.IGNORECASE
+)
+# 4. Наследование в формате стрелки: "Animal <|-- Duck"
+INHERITANCE_RE = re.compile(r'^(\w+)\s+<\|--\s+(\w+)(?:\s*:\s*(.+))?$')
+# 5. Реализация через стрелку: "Discountable <|.. PremiumCustomer"
+IMPL_ARROW_RE = re.compile(r'^(\w+)\s+<\|..\s+(\w+)(?:\s*:\s*(.+))?$', re.IGNORECASE)
+# 6. Словесный формат: "A extends B" или "A implements B"
+KEYWORD_REL_RE = re.compile(r'^(\w+)\s+(extends|implements)\s+(\w+)(?:\s*:\s*(.+))?$', re.IGNORECASE)
+# 7. Ассоциации без карточных меток: "A --> B : label"
+ASSOCIATION_RE = re.compile(r'^(\w+)\s+-->\s+(\w+)(?:\s*:\s*(.+))?$')
+# 8. Зависимости: "A ..> B : label"
+DEPENDENCY_RE = re.compile(r'^(\w+)\s+\.\.>\s+(\w+)(?:\s*:\s*(.+))?$')
+
+DECLARATION_KEYWORDS = frozenset(("class", "interface"))
+# Символы, из которых состоит стрелка в CARD_ASSOC_RE (с учётом IGNORECASE)
+ASSOC_ARROW_CHARS = frozenset("oO*->")
+
+
+def _ensure_entity(entities: dict, name: str, typ: str = "class"):
+    if name not in entities:
+        entities[name] = ClassEntity(name=name, type=typ, body="")
+
+
+def _on_card_assoc(m, entities, relationships):
+    # Группы: 1: source, 2: source_cardinality (опционально),
+    # 3: arrow, 4: target_cardinality (опционально),
+    # 5: target, 6: label (опционально)
+    source, source_card, arrow, target_card, target, label = m.groups()
+    source, target = intern(source), intern(target)
+    relationships.append(
+        ClassRelationship(
+            source=source,
+            target=target,
+            relation="association",
+            label=label or "",
+            source_cardinality=source_card or "",
+            target_cardinality=target_card or "",
+            arrow=arrow or ""
+        )
+    )
+    _ensure_entity(entities, source)
+    _ensure_entity(entities, target)
+
+
+def _on_inheritance(m, entities, relationships):
+    parent, child, label = m.groups()
+    parent, child = intern(parent), intern(child)
+    relationships.append(
+        ClassRelationship(source=child, target=parent, relation="extends", label=label or "")
+    )
+    _ensure_entity(entities, child)
+    _ensure_entity(entities, parent)
+
+
+def _on_impl_arrow(m, entities, relationships):
+    interface, impl_class, label = m.groups()
+    interface, impl_class = intern(interface), intern(impl_class)
+    # В реализации интерфейса, класс реализует интерфейс,
+    # поэтому source = impl_class, target = interface.
+    relationships.append(
+        ClassRelationship(source=impl_class, target=interface, relation="implements", label=label or "")
+    )
+    _ensure_entity(entities, impl_class)
+    _ensure_entity(entities, interface, "interface")
+
+
+def _on_keyword_rel(m, entities, relationships):
+    source, rel_type, target, label = m.groups()
+    source, target = intern(source), intern(target)
+    relationships.append(
+        ClassRelationship(source=source, target=target, relation=intern(rel_type.lower()), label=label or "")
+    )
+    _ensure_entity(entities, source)
+    _ensure_entity(entities, target)
+
+
+def _on_association(m, entities, relationships):
+    source, target, label = m.groups()
+    source, target = intern(source), intern(target)
+    relationships.append(
+        ClassRelationship(source=source, target=target, relation="association", label=label or "")
+    )
+    _ensure_entity(entities, source)
+    _ensure_entity(entities, target)
+
+
+def _on_dependency(m, entities, relationships):
+    source, target, label = m.groups()
+    source, target = intern(source), intern(target)
+    relationships.append(
+        ClassRelationship(source=source, target=target, relation="dependency", label=label or "")
+    )
+    _ensure_entity(entities, source)
+    _ensure_entity(entities, target)
+
+
+# Таблица диспетчеризации: класс строки -> правила (шаблон, обработчик)
+# в том же порядке, в котором их проверял исходный последовательный разбор.
+RELATION_RULES = {
+    "cardinality": ((CARD_ASSOC_RE, _on_card_assoc),),
+    "association": ((CARD_ASSOC_RE, _on_card_assoc), (ASSOCIATION_RE, _on_association)),
+    "inheritance": ((INHERITANCE_RE, _on_inheritance), (IMPL_ARROW_RE, _on_impl_arrow)),
+    "keyword": ((KEYWORD_REL_RE, _on_keyword_rel),),
+    "dependency": ((DEPENDENCY_RE, _on_dependency),),
+}
+# Имена правил в счётчиках core.instrumentation.Instrumentation
+RULE_NAMES = {
+    _on_card_assoc: "class.cardinality_association",
+    _on_inheritance: "class.inheritance",
+    _on_impl_arrow: "class.implementation",
+    _on_keyword_rel: "class.keyword_relation",
+    _on_association: "class.association",
+    _on_dependency: "class.dependency",
+}
+
+
+def classify_relation(tokens) -> str:
+    """
+    Определяет класс строки-отношения по токену, стоящему после первого слова:
+    кавычка карточной метки, стрелка или ключевое слово extends/implements.
+    Возвращает ключ RELATION_RULES или None, если ни одно правило не подходит.
+    """
+    if len(tokens) < 2:
+        return None
+    token = tokens[1]
+    if token[0] == '"':
+        return "cardinality"
+    if token.startswith("<|"):
+        return "inheritance"
+    if token == "..>":
+        return "dependency"
+    if token.lower() in ("extends", "implements"):
+        return "keyword"
+    if ASSOC_ARROW_CHARS.issuperset(token):
+        return "association"
+    return None
+
+
+def split_statements(lines) -> list:
+    """
+    Делит очищенные строки на операторы верхнего уровня: блок "class X { ... }"
+    (вместе с закрывающей "}") или одиночная строка. Каждый оператор
+    разбирается независимо от остальных, что позволяет перерабатывать
+    только изменившиеся части диаграммы (см. core.incremental).
+    """
+    statements = []
+    lines = iter(lines)
+    for line in lines:
+        if line.endswith('{') and BLOCK_DECL_RE.match(line):
+            block = [line]
+            for body_line in lines:
+                block.append(body_line)
+                if body_line == '}':
+                    break
+            statements.append(tuple(block))
+        else:
+            statements.append((line,))
+    return statements
+
 
 class PlantUMLClassParser(DiagramParser):
-    def parse(self, plantuml: str) -> ClassDiagram:
+    def parse_stream(self, lines) -> ClassDiagram:
         # Убираем директивы @startuml и @enduml, а также пустые строки
-        lines = [
-            line.strip()
-            for line in plantuml.splitlines()
-            if line.strip() and not line.strip().startswith('@')
-        ]
+        lines = clean_lines(lines)
         entities = {}
         relationships = []
-        i = 0
+        metrics = self.instrumentation
 
-        # Регулярное выражение для отношений с карточными метками,
-        # например: Customer "1" --> "0..*" Order : places
-        card_assoc_re = re.compile(
-            r'^(\w+)(?:\s+"([^"]+)")?\s+([o*\-\>]+)\s+(?:"([^"]+)"\s+)?(\w+)(?:\s*:\s*(.+))?$',
-            re.IGNORECASE
-        )
-        # Регулярное выражение для реализации через стрелку, например:
-        # Discountable <|.. PremiumCustomer
-        impl_arrow_re = re.compile(
-            r'^(\w+)\s+<\|..\s+(\w+)(?:\s*:\s*(.+))?$',
-            re.IGNORECASE
-        )
-        
-        while i < len(lines):
-            line = lines[i]
-            matched = False
-
-            # 1. Блочное определение класса или интерфейса: "class MyClass {"
-            m_block = re.match(r'^(class|interface)\s+(\w+)\s*\{$', line, re.IGNORECASE)
-            if m_block:
-                typ, name = m_block.groups()
-                body_lines = []
-                i += 1
-                while i < len(lines) and lines[i] != '}':
-                    body_lines.append(lines[i])
-                    i += 1
-                body = "\n".join(body_lines)
-                entities[name] = ClassEntity(name=name, type=typ.lower(), body=body)
-                matched = True
-                i += 1  # пропускаем "}"
-                continue
-
-            # 2. Inline-объявление класса или интерфейса: "class MyClass"
-            m_inline = re.match(r'^(class|interface)\s+(\w+)$', line, re.IGNORECASE)
-            if m_inline:
-                typ, name = m_inline.groups()
-                entities[name] = ClassEntity(name=name, type=typ.lower(), body="")
-                matched = True
-                i += 1
-                continue
-
-            # 3. Отношения с карточными метками (если есть)
-            m_card = card_assoc_re.match(line)
-            if m_card:
-                # Группы: 1: source, 2: source_cardinality (опционально),
-                # 3: arrow, 4: target_cardinality (опционально),
-                # 5: target, 6: label (опционально)
-                source, source_card, arrow, target_card, target, label = m_card.groups()
-                relationships.append(
-                    ClassRelationship(
-                        source=source,
-                        target=target,
-                        relation="association",
-                        label=label or "",
-                        source_cardinality=source_card or "",
-                        target_cardinality=target_card or "",
-                        arrow=arrow or ""
-                    )
-                )
-                if source not in entities:
-                    entities[source] = ClassEntity(name=source, type="class", body="")
-                if target not in entities:
-                    entities[target] = ClassEntity(name=target, type="class", body="")
-                matched = True
-                i += 1
-                continue
-
-            # 4. Наследование в формате стрелки: "Animal <|-- Duck"
-            m_inh = re.match(r'^(\w+)\s+<\|--\s+(\w+)(?:\s*:\s*(.+))?$', line)
-            if m_inh:
-                parent, child, label = m_inh.groups()
-                relationships.append(
-                    ClassRelationship(
-                        source=child,
-                        target=parent,
-                        relation="extends",
-                        label=label or ""
-                    )
-                )
-                if child not in entities:
-                    entities[child] = ClassEntity(name=child, type="class", body="")
-                if parent not in entities:
-                    entities[parent] = ClassEntity(name=parent, type="class", body="")
-                matched = True
-                i += 1
-                continue
-
-            # 5. Реализация через стрелку: "Discountable <|.. PremiumCustomer"
-            m_impl_arrow = impl_arrow_re.match(line)
-            if m_impl_arrow:
-                interface, impl_class, label = m_impl_arrow.groups()
-                # В реализации интерфейса, класс реализует интерфейс,
-                # поэтому source = impl_class, target = interface.
-                relationships.append(
-                    ClassRelationship(
-                        source=impl_class,
-                        target=interface,
-                        relation="implements",
-                        label=label or ""
-                    )
-                )
-                if impl_class not in entities:
-                    entities[impl_class] = ClassEntity(name=impl_class, type="class", body="")
-                if interface not in entities:
-                    entities[interface] = ClassEntity(name=interface, type="interface", body="")
-                matched = True
-                i += 1
-                continue
-
-            # 6. Отношения типа extends или implements (словесный формат),
-            # например: "A extends B" или "A implements B"
-            m_rel = re.match(r'^(\w+)\s+(extends|implements)\s+(\w+)(?:\s*:\s*(.+))?$', line, re.IGNORECASE)
-            if m_rel:
-                source, rel_type, target, label = m_rel.groups()
-                relationships.append(
-                    ClassRelationship(
-                        source=source,
-                        target=target,
-                        relation=rel_type.lower(),
-                        label=label or ""
-                    )
-                )
-                if source not in entities:
-                    entities[source] = ClassEntity(name=source, type="class", body="")
-                if target not in entities:
-                    entities[target] = ClassEntity(name=target, type="class", body="")
-                matched = True
-                i += 1
-                continue
-
-            # 7. Ассоциации без карточных меток: "A --> B : label"
-            m_assoc = re.match(r'^(\w+)\s+-->\s+(\w+)(?:\s*:\s*(.+))?$', line)
-            if m_assoc:
-                source, target, label = m_assoc.groups()
-                relationships.append(
-                    ClassRelationship(
-                        source=source,
-                        target=target,
-                        relation="association",
-                        label=label or ""
-                    )
-                )
-                if source not in entities:
-                    entities[source] = ClassEntity(name=source, type="class", body="")
-                if target not in entities:
-                    entities[target] = ClassEntity(name=target, type="class", body="")
-                matched = True
-                i += 1
-                continue
-
-            # 8. Зависимости: "A ..> B : label"
-            m_dep = re.match(r'^(\w+)\s+\.\.>\s+(\w+)(?:\s*:\s*(.+))?$', line)
-            if m_dep:
-                source, target, label = m_dep.groups()
-                relationships.append(
-                    ClassRelationship(
-                        source=source,
-                        target=target,
-                        relation="dependency",
-                        label=label or ""
-                    )
-                )
-                if source not in entities:
-                    entities[source] = ClassEntity(name=source, type="class", body="")
-                if target not in entities:
-                    entities[target] = ClassEntity(name=target, type="class", body="")
-                matched = True
-                i += 1
-                continue
-
-            if not matched:
-                # Выводим для отладки строки, которые не распознаны
-                print(f"Unparsed line: {line}")
-            i += 1
+        for line in lines:
+            # Каждая строка классифицируется один раз: по ведущему ключевому
+            # слову или по токену стрелки, после чего проверяются только
+            # подходящие для этого класса шаблоны.
+            tokens = line.split(None, 2)
+
+            if tokens[0].lower() in DECLARATION_KEYWORDS:
+                m_block = BLOCK_DECL_RE.match(line)
+                if m_block:
+                    typ, name = m_block.groups()
+                    name = intern(name)
+                    body_lines = []
+                    # Тело класса читается из того же потока до "}" включительно
+                    for body_line in lines:
+                        if body_line == '}':
+                            break
+                        body_lines.append(body_line)
+                    body = "\n".join(body_lines)
+                    entities[name] = ClassEntity(name=name, type=intern(typ.lower()), body=body)
+                    if metrics is not None:
+                        metrics.rule("class.block_declaration")
+                    continue
+
+                m_inline = INLINE_DECL_RE.match(line)
+                if m_inline:
+                    typ, name = m_inline.groups()
+                    name = intern(name)
+                    entities[name] = ClassEntity(name=name, type=intern(typ.lower()), body="")
+                    if metrics is not None:
+                        metrics.rule("class.inline_declaration")
+                    continue
+
+            for pattern, handler in RELATION_RULES.get(classify_relation(tokens), ()):
+                match = pattern.match(line)
+                if match:
+                    handler(match, entities, relationships)
+                    if metrics is not None:
+                        metrics.rule(RULE_NAMES[handler])
+                    break
+            else:
+                # Нераспознанные строки попадают в метрики вместо вывода в stdout
+                if metrics is not None:
+                    metrics.unparsed_line(line)
 
         return ClassDiagram(entities=list(entities.values()), relationships=relationships)
@@ -0,0 +1,223 @@
+"""
+Batch converter: walks files and directories, converts every PlantUML file
+to Mermaid in a process pool and writes the result next to it as .mmd
+(or into a mirrored tree under --output-dir). Sources that would write the
+same output (a.puml and a.plantuml -> a.mmd) are reported as failed and
+none of them is converted.
+
+With --manifest, only files that changed since the previous run are
+converted (see core.manifest), and outputs of deleted sources are removed.
+
+Usage:
+    python -m cli.batch_convert docs/ -j 8
+    python -m cli.batch_convert docs/ --type sequence -j 8
+    python -m cli.batch_convert docs/ --manifest .plantuml-manifest.json
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core.conversion_cache import ConversionCache
+from core.converters import DIAGRAM_TYPES, get_converter
+from core.diagram_detector import detect_file_type
+from core.manifest import ConversionManifest, resolve_path
+
+DEFAULT_EXTENSIONS = (".puml", ".plantuml")
+OUTPUT_EXTENSION = ".mmd"
+AUTO_TYPE = "auto"
+
+# Per-process conversion cache, created by init_worker when --cache is given
+_cache = None
+
+
+def find_sources(paths, extensions=DEFAULT_EXTENSIONS):
+    """
+    Yields (source, root) pairs: every file given explicitly, plus every file
+    with a matching extension found under the given directories.
+    """
+    for path in map(Path, paths):
+        if path.is_dir():
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.endswith(extensions):
+                        yield Path(dirpath, filename), path
+        else:
+            yield path, path.parent
+
+
+def output_path(source: Path, root: Path, output_dir=None) -> Path:
+    target = source.with_suffix(OUTPUT_EXTENSION)
+    if output_dir is None:
+        return target
+    return Path(output_dir, target.relative_to(root))
+
+
+def find_conflicts(tasks) -> dict:
+    """Returns {source: error} for the tasks whose output is also written for another source."""
+    owners = {}
+    for source, output, _ in tasks:
+        owners.setdefault(output, []).append(source)
+    conflicts = {}
+    for output, sources in owners.items():
+        if len(sources) > 1:
+            for source in sources:
+                others = ", ".join(other for other in sources if other != source)
+                conflicts[source] = f"{output} would also be written for {others}"
+    return conflicts
+
+
+def init_worker(cache_path=None):
+    global _cache  # pylint: disable=global-statement
+    _cache = ConversionCache(db_path=cache_path) if cache_path else None
+
+
+def convert_one(task):
+    """
+    Worker entry point. Converts one file and returns (source, error, cached);
+    error is None on success. Exceptions never escape, so one broken
+    diagram does not stop the run.
+    """
+    source, target, kind = task
+    cached = False
+    tmp_path = None
+    try:
+        if kind == AUTO_TYPE:
+            kind = detect_file_type(source)
+            if kind is None:
+                return source, "could not detect the diagram type, pass --type explicitly", False
+        target_dir = Path(target).parent
+        target_dir.mkdir(parents=True, exist_ok=True)
+        # Written next to the target and renamed over it, so a failure never
+        # leaves a truncated output behind
+        fd, tmp_path = tempfile.mkstemp(dir=str(target_dir), prefix=".convert-", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            if _cache is None:
+                # Stream the output line by line instead of building the whole string
+                parser, generator = get_converter(kind)
+                generator.write(parser.parse_file(source), out)
+            else:
+                # The cache is keyed by the content, so the whole text is needed
+                with open(source, encoding="utf-8") as fp:
+                    plantuml = fp.read()
+                hits = _cache.stats.hits
+                out.write(_cache.convert(plantuml, kind))
+                cached = _cache.stats.hits > hits
+        shutil.copymode(source, tmp_path)
+        os.replace(tmp_path, target)
+    except Exception as e:  # pylint: disable=broad-except
+        return source, f"{type(e).__name__}: {e}", False
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return source, None, cached
+
+
+def remove_output(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def run(tasks, jobs: int, cache_path=None):
+    """Runs the conversion tasks and yields (source, error, cached) as they finish."""
+    if jobs == 1:
+        init_worker(cache_path)
+        yield from map(convert_one, tasks)
+        return
+    # Small chunks amortize the IPC cost over thousands of tiny files
+    # while still keeping every worker busy until the end.
+    chunksize = max(1, min(64, len(tasks) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_path,)) as executor:
+        yield from executor.map(convert_one, tasks, chunksize=chunksize)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Convert PlantUML files to Mermaid in parallel.")
+    arg_parser.add_argument("paths", nargs="+", help="files or directories to convert")
+    arg_parser.add_argument("-t", "--type", dest="kind", choices=(AUTO_TYPE,) + DIAGRAM_TYPES, default=AUTO_TYPE,
+                            help="diagram type of the input files (default: detect per file)")
+    arg_parser.add_argument("-o", "--output-dir",
+                            help="write outputs into this directory instead of next to the sources")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                            help="number of worker processes (default: CPU count)")
+    arg_parser.add_argument("--ext", action="append", dest="extensions",
+                            help=f"source file extension to look for (default: {', '.join(DEFAULT_EXTENSIONS)})")
+    arg_parser.add_argument("--cache", metavar="PATH",
+                            help="SQLite file used to cache conversion results between runs")
+    arg_parser.add_argument("--manifest", metavar="PATH",
+                            help="JSON manifest of the previous run: convert only changed files "
+                                 "and remove outputs of deleted ones")
+    args = arg_parser.parse_args(argv)
+
+    extensions = tuple(args.extensions) if args.extensions else DEFAULT_EXTENSIONS
+    unique = {}
+    for source, root in find_sources(args.paths, extensions):
+        # A file may be given both directly and inside a given directory
+        unique.setdefault(str(source), (str(source), str(output_path(source, root, args.output_dir)), args.kind))
+    tasks = list(unique.values())
+    # Absolute, like the outputs recorded in the manifest
+    targets = {resolve_path(task[1]) for task in tasks}
+    conflicts = find_conflicts(tasks)
+    tasks = [task for task in tasks if task[0] not in conflicts]
+
+    start = time.perf_counter()
+    failures = []
+    for source, error in conflicts.items():
+        failures.append(source)
+        print(f"FAILED {source}: {error}", file=sys.stderr)
+    manifest = None
+    up_to_date = removed = 0
+    if args.manifest:
+        manifest = ConversionManifest.load(args.manifest)
+        for source in conflicts:
+            manifest.forget(source)
+        for source in manifest.orphans(unique):
+            output = manifest.forget(source).output
+            # The output may already belong to another source of this run
+            if output not in targets:
+                remove_output(output)
+            removed += 1
+        stale = {item.source: item for item in manifest.stale(tasks)}
+        up_to_date = len(tasks) - len(stale)
+        tasks = [task for task in tasks if task[0] in stale]
+
+    cache_hits = 0
+    for source, error, cached in run(tasks, max(1, args.jobs), args.cache):
+        cache_hits += cached
+        if error is not None:
+            failures.append(source)
+            print(f"FAILED {source}: {error}", file=sys.stderr)
+            if manifest is not None:
+                # Converted again on the next run
+                manifest.forget(source)
+        elif manifest is not None:
+            item = stale[source]
+            if item.previous_output is not None and item.previous_output not in targets:
+                remove_output(item.previous_output)
+            manifest.record(item)
+    if manifest is not None:
+        manifest.save()
+    elapsed = time.perf_counter() - start
+
+    total = len(tasks) + len(conflicts)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Converted {total - len(failures)}/{total} files "
+        f"({len(failures)} failed) in {elapsed:.2f} s, {rate:,.1f} files/sec"
+    )
+    if args.cache:
+        print(f"Cache hits: {cache_hits}/{total}")
+    if manifest is not None:
+        print(f"Up to date: {up_to_date}, removed outputs of deleted sources: {removed}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+HTTP conversion service: an asyncio server (standard library only) that
+exposes the PlantUML -> Mermaid converters. Conversions are CPU-bound and
+run in a process pool (or a thread pool with --threads), so the event loop
+keeps serving other connections meanwhile.
+
+Endpoints (JSON in, JSON out):
+    POST /convert        {"plantuml": "...", "type": "sequence"}
+                         -> {"type": "sequence", "mermaid": "..."}
+    POST /convert/batch  {"diagrams": [{"id": "a", "plantuml": "...", "type": "auto"}, ...]}
+                         -> {"results": [{"id": "a", "type": "...", "mermaid": "..."}
+                                         or {"id": "a", "error": "..."}, ...]}
+    GET  /health         -> {"status": "ok"}
+"type" is optional and defaults to "auto" (detected from the text).
+Requests larger than --max-body-bytes are rejected with 413, and batches
+longer than --max-batch-items with 400. POST requests need a Content-Length. A conversion that does not finish
+within --timeout seconds is answered with 504. A process pool cannot
+interrupt a running task: its worker stays busy until the task ends, but
+the client gets the 504 immediately. Unexpected errors (e.g. a broken
+pool) are logged and answered with 500.
+
+SIGTERM (and Ctrl-C) stops accepting connections and shuts the pool down,
+cancelling queued conversions, so no worker process outlives the service.
+
+Usage:
+    python -m cli.http_service --port 8000 [--workers 4] [--threads]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+from core.conversion_cache import ConversionCache, cache_key
+from core.converters import DIAGRAM_TYPES, convert
+from core.diagram_detector import detect_diagram_type
+
+AUTO_TYPE = "auto"
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_MAX_BATCH_ITEMS = 256
+DEFAULT_TIMEOUT = 10.0
+# How long an idle keep-alive connection (or a slow client sending headers) is kept
+IDLE_TIMEOUT = 30.0
+MAX_HEADERS = 100
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.message = message or status.phrase
+
+
+def convert_task(plantuml: str, kind: str):
+    """
+    Pool entry point. Returns (kind, mermaid code, error); error is None on
+    success. Exceptions never escape, so they do not need to be pickled.
+    """
+    try:
+        if kind == AUTO_TYPE:
+            kind = detect_diagram_type(plantuml)
+            if kind is None:
+                return None, None, "could not detect the diagram type, pass \"type\" explicitly"
+        return kind, convert(plantuml, kind), None
+    except Exception as e:  # pylint: disable=broad-except
+        return kind, None, f"{type(e).__name__}: {e}"
+
+
+def _parse_item(item) -> tuple:
+    if not isinstance(item, dict) or not isinstance(item.get("plantuml"), str):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, 'every diagram must be an object with a "plantuml" string')
+    kind = item.get("type", AUTO_TYPE)
+    if kind != AUTO_TYPE and kind not in DIAGRAM_TYPES:
+        raise HTTPError(HTTPStatus.BAD_REQUEST,
+                        f"unknown type {kind!r}, expected one of {', '.join((AUTO_TYPE,) + DIAGRAM_TYPES)}")
+    return item["plantuml"], kind
+
+
+class ConversionService:
+    """
+    Request handling of the service. Results are kept in an in-memory
+    ConversionCache (cache_entries=0 disables it), so diagrams that a docs
+    build sends again and again skip the pool entirely.
+    """
+
+    def __init__(self, executor, max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                 max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS, timeout: float = DEFAULT_TIMEOUT,
+                 cache_entries: int = 1024):
+        self.executor = executor
+        self.max_body_bytes = max_body_bytes
+        self.max_batch_items = max_batch_items
+        self.timeout = timeout
+        self.cache = ConversionCache(max_entries=cache_entries) if cache_entries else None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as e:
+                    # The rest of the request was not read, so the connection cannot be reused
+                    await self._respond(writer, e.status, {"error": e.message}, keep_alive=False)
+                    return
+                if request is None:
+                    return
+                method, path, body, keep_alive = request
+                try:
+                    status, payload = await self.route(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception:  # pylint: disable=broad-except
+                    # E.g. BrokenProcessPool: the client still gets an answer
+                    logger.exception("Failed to handle %s %s", method, path)
+                    status, payload, keep_alive = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}, False
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to handle a request")
+            with contextlib.suppress(Exception):
+                await self._respond(writer, HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"},
+                                    keep_alive=False)
+        finally:
+            writer.close()
+
+    async def route(self, method: str, path: str, body: bytes) -> tuple:
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+            return HTTPStatus.OK, {"status": "ok"}
+        if path not in ("/convert", "/convert/batch"):
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        try:
+            request = json.loads(body)
+        except (ValueError, RecursionError):
+            # RecursionError: arrays/objects nested deeper than the decoder can go
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "the body is not valid JSON") from None
+
+        if path == "/convert":
+            result = await self.convert(*_parse_item(request))
+            if "error" in result:
+                return HTTPStatus.UNPROCESSABLE_ENTITY, result
+            return HTTPStatus.OK, result
+
+        diagrams = request.get("diagrams") if isinstance(request, dict) else None
+        if not isinstance(diagrams, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'expected {"diagrams": [...]}')
+        if len(diagrams) > self.max_batch_items:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"at most {self.max_batch_items} diagrams per batch")
+        items = [_parse_item(item) for item in diagrams]
+        # All diagrams of the batch are converted in parallel under one deadline
+        results = await self._with_timeout(asyncio.gather(*(self.convert(*item) for item in items)))
+        for item, result in zip(diagrams, results):
+            if "id" in item:
+                result["id"] = item["id"]
+        return HTTPStatus.OK, {"results": results}
+
+    async def convert(self, plantuml: str, kind: str) -> dict:
+        """Converts one diagram and returns its result object."""
+        key = cache_key(plantuml, kind)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        loop = asyncio.get_running_loop()
+        kind, mermaid_code, error = await self._with_timeout(
+            loop.run_in_executor(self.executor, convert_task, plantuml, kind)
+        )
+        result = {"type": kind, "error": error} if error is not None else {"type": kind, "mermaid": mermaid_code}
+        if self.cache is not None:
+            # Errors are cached too: the same text fails the same way
+            self.cache.put(key, json.dumps(result))
+        return result
+
+    async def _with_timeout(self, awaitable):
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, f"conversion took longer than {self.timeout:g} s") from None
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """Returns (method, path, body, keep_alive), or None when the client closed the connection."""
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return None
+            try:
+                method, path, version = request_line.decode("latin-1").split()
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line") from None
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.LimitOverrunError):
+            # A request or header line longer than the stream buffer limit
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE) from None
+
+        if "transfer-encoding" in headers:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "chunked bodies are not supported")
+        if "content-length" not in headers:
+            if method == "POST":
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length is required")
+            headers["content-length"] = "0"
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"the body is limited to {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        return method, path, body, keep_alive
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict, keep_alive: bool):
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+
+async def serve(service: ConversionService, host: str, port: int, stop: asyncio.Event = None):
+    """Serves until stop is set, or without it until SIGTERM or SIGINT."""
+    if stop is None:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except NotImplementedError:
+                # Windows: Ctrl-C still arrives as KeyboardInterrupt
+                pass
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    address = server.sockets[0].getsockname()
+    # The load test waits for this line to learn the port when started with --port 0
+    print(f"Listening on http://{address[0]}:{address[1]}", flush=True)
+    async with server:
+        await stop.wait()
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Serve PlantUML to Mermaid conversion over HTTP.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000, help="0 picks a free port")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="size of the conversion pool (default: CPU count)")
+    arg_parser.add_argument("--threads", action="store_true",
+                            help="use a thread pool instead of a process pool")
+    arg_parser.add_argument("--max-body-bytes", type=int, default=DEFAULT_MAX_BODY_BYTES)
+    arg_parser.add_argument("--max-batch-items", type=int, default=DEFAULT_MAX_BATCH_ITEMS)
+    arg_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                            help="per-request conversion timeout in seconds")
+    arg_parser.add_argument("--cache-entries", type=int, default=1024,
+                            help="results kept in memory (0 disables the cache)")
+    args = arg_parser.parse_args(argv)
+
+    pool_class = ThreadPoolExecutor if args.threads else ProcessPoolExecutor
+    executor = pool_class(max_workers=max(1, args.workers))
+    service = ConversionService(executor, args.max_body_bytes, args.max_batch_items,
+                                args.timeout, args.cache_entries)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Queued conversions are dropped; running ones finish and the workers exit
+        if sys.version_info >= (3, 9):
+            executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            # Python 3.8 has no cancel_futures: the queue is drained first
+            executor.shutdown(wait=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
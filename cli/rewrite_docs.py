@@ -0,0 +1,270 @@
+"""
+Docs rewriter: finds PlantUML blocks embedded in Markdown and AsciiDoc
+documents and replaces them with Mermaid blocks, converting the files in
+a process pool. Documents are streamed line by line into a temporary file
+that atomically replaces the original (or goes to a mirrored tree under
+--output-dir); documents without PlantUML blocks are left untouched.
+
+Recognized blocks:
+    ```plantuml / ```puml / ~~~puml ... (Markdown fences)  -> ```mermaid
+    [plantuml] or [source,plantuml] + ---- / .... block (AsciiDoc)  -> [mermaid] / [source,mermaid]
+The diagram type of each block is detected from its text. Blocks that
+cannot be detected or converted are kept as they are and reported.
+
+With --cache, converted blocks are stored in SQLite by content hash (see
+core.conversion_cache): blocks unchanged since the previous run are not
+converted again.
+
+Usage:
+    python -m cli.rewrite_docs docs/ -j 8
+    python -m cli.rewrite_docs docs/ --output-dir build/docs --cache .diagrams.sqlite
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from cli.batch_convert import find_sources
+from core.conversion_cache import ConversionCache
+from core.converters import convert
+from core.diagram_detector import detect_diagram_type
+
+DEFAULT_EXTENSIONS = (".md", ".markdown", ".adoc", ".asciidoc")
+TARGET_LANGUAGE = "mermaid"
+
+# Markdown fence opening a PlantUML block: up to 3 spaces, ``` or ~~~, language
+FENCE_OPEN_RE = re.compile(r'^( {0,3})(`{3,}|~{3,})[ \t]*(plantuml|puml)\b(?!-)', re.IGNORECASE)
+# Any other fenced block, copied verbatim
+OTHER_FENCE_RE = re.compile(r'^( {0,3})(`{3,}|~{3,})')
+# AsciiDoc block attribute line: [plantuml], [source,plantuml], [plantuml,format=svg], ...
+ADOC_ATTRIBUTE_RE = re.compile(r'^\[(?:source,\s*)?(plantuml|puml)\b[^\]]*\]\s*$', re.IGNORECASE)
+ADOC_DELIMITER_RE = re.compile(r'^(-{4,}|\.{4,})\s*$')
+
+# Per-process conversion cache, created by init_worker when --cache is given
+_cache = None
+
+
+@dataclass
+class RewriteStats:
+    blocks: int = 0
+    cached: int = 0
+    # (line number of the block, reason) for the blocks left unchanged
+    failed: list = field(default_factory=list)
+
+
+def init_worker(cache_path=None):
+    global _cache  # pylint: disable=global-statement
+    _cache = ConversionCache(db_path=cache_path) if cache_path else None
+
+
+def convert_block(text: str):
+    """Returns (mermaid code, cached) for a block; raises ValueError if it cannot be converted."""
+    kind = detect_diagram_type(text)
+    if kind is None:
+        raise ValueError("could not detect the diagram type")
+    if _cache is None:
+        return convert(text, kind), False
+    hits = _cache.stats.hits
+    mermaid_code = _cache.convert(text, kind)
+    return mermaid_code, _cache.stats.hits > hits
+
+
+def _retag(line: str, match, group: int) -> str:
+    """Replaces the language matched by the group with mermaid, keeping the rest of the line."""
+    return line[:match.start(group)] + TARGET_LANGUAGE + line[match.end(group):]
+
+
+def _is_fence_close(line: str, fence: str) -> bool:
+    stripped = line.strip()
+    return (len(line) - len(line.lstrip(" ")) <= 3 and stripped.startswith(fence)
+            and stripped == fence[0] * len(stripped))
+
+
+def _read_until(lines, is_closing):
+    """Collects the block body; returns (body lines, closing line or None at the end of input)."""
+    body = []
+    for line in lines:
+        if is_closing(line):
+            return body, line
+        body.append(line)
+    return body, None
+
+
+def rewrite_lines(lines, stats: RewriteStats):
+    """
+    Yields the lines of the rewritten document (with their line endings).
+    Lines outside PlantUML blocks are passed through unchanged; only the
+    block being converted is held in memory. Fenced blocks in other
+    languages are copied verbatim, so PlantUML examples inside them stay.
+    """
+    lines = iter(lines)
+    number = 0
+
+    def numbered():
+        nonlocal number
+        for line in lines:
+            number += 1
+            yield line
+
+    source = numbered()
+    previous = None
+    for line in source:
+        fence = FENCE_OPEN_RE.match(line)
+        other_fence = OTHER_FENCE_RE.match(line) if not fence else None
+        if (fence or other_fence) and previous is not None:
+            # An attribute line followed by a fence rather than an AsciiDoc block
+            yield previous
+            previous = None
+        if fence:
+            start = number
+            body, closing = _read_until(source, lambda l: _is_fence_close(l, fence.group(2)))
+            yield from _render_block((line,), (_retag(line, fence, 3),), body, closing,
+                                     fence.group(1), stats, start)
+            continue
+        if other_fence:
+            yield line
+            body, closing = _read_until(source, lambda l: _is_fence_close(l, other_fence.group(2)))
+            yield from body
+            if closing is not None:
+                yield closing
+            continue
+        attribute = ADOC_ATTRIBUTE_RE.match(previous) if previous is not None else None
+        delimiter = ADOC_DELIMITER_RE.match(line) if attribute else None
+        if delimiter:
+            # The attribute line was held back until it was clear that a block follows
+            start = number - 1
+            body, closing = _read_until(source, lambda l: l.rstrip() == delimiter.group(1))
+            yield from _render_block((previous, line), (_retag(previous, attribute, 1), line), body, closing,
+                                     "", stats, start)
+            previous = None
+            continue
+        if previous is not None:
+            yield previous
+        if ADOC_ATTRIBUTE_RE.match(line):
+            previous = line
+        else:
+            previous = None
+            yield line
+    if previous is not None:
+        yield previous
+
+
+def _render_block(original: tuple, opening: tuple, body: list, closing, indent: str,
+                  stats: RewriteStats, start_line: int):
+    stats.blocks += 1
+    if closing is None:
+        # Unterminated block: keep the rest of the document as it is
+        stats.failed.append((start_line, "the block is not closed"))
+        yield from original
+        yield from body
+        return
+    text = "".join(line[len(indent):] if line.startswith(indent) else line for line in body)
+    try:
+        mermaid_code, cached = convert_block(text)
+    except Exception as e:  # pylint: disable=broad-except
+        stats.failed.append((start_line, f"{type(e).__name__}: {e}"))
+        yield from original
+        yield from body
+        yield closing
+        return
+    stats.cached += cached
+    newline = "\r\n" if closing.endswith("\r\n") else "\n"
+    yield from opening
+    for mermaid_line in mermaid_code.split("\n"):
+        yield f"{indent}{mermaid_line}{newline}" if mermaid_line else newline
+    yield closing
+
+
+def rewrite_one(task):
+    """
+    Worker entry point. Rewrites one document and returns (source, stats, error);
+    error is None on success. Exceptions never escape, so one broken
+    document does not stop the run.
+    """
+    source, target = task
+    stats = RewriteStats()
+    try:
+        target_dir = Path(target).parent
+        target_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(target_dir), prefix=".rewrite-", suffix=".tmp")
+        try:
+            with open(source, encoding="utf-8", newline="") as src, \
+                    os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+                out.writelines(rewrite_lines(src, stats))
+            if stats.blocks or source != target:
+                shutil.copymode(source, tmp_path)
+                os.replace(tmp_path, target)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+    except Exception as e:  # pylint: disable=broad-except
+        return source, stats, f"{type(e).__name__}: {e}"
+    return source, stats, None
+
+
+def run(tasks, jobs: int, cache_path=None):
+    """Runs the rewrite tasks and yields (source, stats, error) as they finish."""
+    if jobs == 1:
+        init_worker(cache_path)
+        yield from map(rewrite_one, tasks)
+        return
+    chunksize = max(1, min(16, len(tasks) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(cache_path,)) as executor:
+        yield from executor.map(rewrite_one, tasks, chunksize=chunksize)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        description="Replace PlantUML blocks in Markdown/AsciiDoc documents with Mermaid blocks."
+    )
+    arg_parser.add_argument("paths", nargs="+", help="documents or directories to rewrite")
+    arg_parser.add_argument("-o", "--output-dir",
+                            help="write documents into this directory instead of rewriting them in place")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                            help="number of worker processes (default: CPU count)")
+    arg_parser.add_argument("--ext", action="append", dest="extensions",
+                            help=f"document extension to look for (default: {', '.join(DEFAULT_EXTENSIONS)})")
+    arg_parser.add_argument("--cache", metavar="PATH",
+                            help="SQLite file used to skip blocks converted by a previous run")
+    args = arg_parser.parse_args(argv)
+
+    extensions = tuple(args.extensions) if args.extensions else DEFAULT_EXTENSIONS
+    tasks = [
+        (str(source), str(Path(args.output_dir, source.relative_to(root)) if args.output_dir else source))
+        for source, root in find_sources(args.paths, extensions)
+    ]
+
+    start = time.perf_counter()
+    documents = blocks = cached = failed_blocks = 0
+    failures = []
+    for source, stats, error in run(tasks, max(1, args.jobs), args.cache):
+        if error is not None:
+            failures.append(source)
+            print(f"FAILED {source}: {error}", file=sys.stderr)
+            continue
+        documents += stats.blocks > 0
+        blocks += stats.blocks
+        cached += stats.cached
+        failed_blocks += len(stats.failed)
+        for line, reason in stats.failed:
+            print(f"KEPT {source}:{line}: {reason}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    rate = blocks / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Rewrote {blocks - failed_blocks}/{blocks} blocks in {documents} of {len(tasks)} documents "
+        f"({len(failures)} failed) in {elapsed:.2f} s, {rate:,.1f} blocks/sec"
+    )
+    if args.cache:
+        print(f"Cache hits: {cached}/{blocks}")
+    return 1 if failures or failed_blocks else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,33 @@
 # mermaid_generator.py
-from core.diagram_model import ComponentDiagram
+from core.diagram_model import ComponentDiagram, Component, Edge
+from core.diagram_generator import DiagramGenerator
 from core.base_mermaid_generator import BaseMermaidGenerator
 
-class MermaidGenerator(BaseMermaidGenerator):
-    def generate(self, diagram: ComponentDiagram) -> str:
-        lines = ["flowchart LR"]
-        # Определения компонентов: экранируем метку через BaseMermaidGenerator.escape_text
+class MermaidGenerator(BaseMermaidGenerator, DiagramGenerator):
+    def iter_lines(self, diagram: ComponentDiagram):
+        yield "flowchart LR"
+        # Все метки диаграммы экранируются одним вызовом escape_many
+        labels = self.escape_many(
+            [comp.label for comp in diagram.components] +
+            [edge.label for edge in diagram.edges if edge.label]
+        )
+        safe_labels = iter(labels)
+        # Определения компонентов
         for comp in diagram.components:
-            safe_label = self.escape_text(comp.label)
-            lines.append(f'{comp.id}["{safe_label}"]')
-        # Определения связей: экранируем метки через BaseMermaidGenerator.escape_text
+            yield self.render_component(comp, next(safe_labels))
+        # Определения связей
         for edge in diagram.edges:
-            if edge.label:
+            yield self.render_edge(edge, next(safe_labels) if edge.label else None)
+
+    def render_component(self, comp: Component, safe_label: str = None) -> str:
+        # Экранируем метку через BaseMermaidGenerator.escape_text, если она не экранирована заранее
+        if safe_label is None:
+            safe_label = self.escape_text(comp.label)
+        return f'{comp.id}["{safe_label}"]'
+
+    def render_edge(self, edge: Edge, safe_edge_label: str = None) -> str:
+        if edge.label:
+            if safe_edge_label is None:
                 safe_edge_label = self.escape_text(edge.label)
-                lines.append(f'{edge.source} -->|{safe_edge_label}| {edge.target}')
-            else:
-                lines.append(f'{edge.source} --> {edge.target}')
-        return "\n".join(lines)
+            return f'{edge.source} -->|{safe_edge_label}| {edge.target}'
+        return f'{edge.source} --> {edge.target}'
@@ -1,46 +1,48 @@
 # plantuml_parser.py
 import re
+from sys import intern
 from core.diagram_model import Component, Edge, ComponentDiagram
-from core.diagram_parser import DiagramParser
+from core.diagram_parser import DiagramParser, clean_lines
+
+# Шаблоны для парсинга
+COMP_QUOTED_RE = re.compile(r'^component\s+"([^"]+)"\s+as\s+(\w+)', re.IGNORECASE)
+COMP_SIMPLE_RE = re.compile(r'^component\s+(\w+)', re.IGNORECASE)
+# Поддержка стрелок --> и <--
+EDGE_RE = re.compile(r'^(\w+)\s+((?:-->|<--))\s+(\w+)(?:\s*:\s*(.+))?$', re.IGNORECASE)
 
 class PlantUMLComponentParser(DiagramParser):
-    def parse(self, plantuml: str) -> ComponentDiagram:
-        # Удаляем директивы @startuml/@enduml и пустые строки
-        lines = [
-            line.strip()
-            for line in plantuml.splitlines()
-            if line.strip() and not line.strip().startswith('@')
-        ]
-        
+    def parse_stream(self, lines) -> ComponentDiagram:
         components = {}
         edges = []
+        metrics = self.instrumentation
         
-        # Шаблоны для парсинга
-        comp_quoted_pattern = re.compile(r'^component\s+"([^"]+)"\s+as\s+(\w+)', re.IGNORECASE)
-        comp_simple_pattern = re.compile(r'^component\s+(\w+)', re.IGNORECASE)
-        # Поддержка стрелок --> и <--
-        edge_pattern = re.compile(r'^(\w+)\s+((?:-->|<--))\s+(\w+)(?:\s*:\s*(.+))?$', re.IGNORECASE)
-        
-        for line in lines:
+        # Удаляем директивы @startuml/@enduml и пустые строки
+        for line in clean_lines(lines):
             # Парсим компонент с кавычками
-            match = comp_quoted_pattern.match(line)
+            match = COMP_QUOTED_RE.match(line)
             if match:
                 label, comp_id = match.groups()
+                comp_id = intern(comp_id)
                 components[comp_id] = Component(id=comp_id, label=label)
+                if metrics is not None:
+                    metrics.rule("components.quoted_component")
                 continue
             
             # Парсим простой компонент
-            match = comp_simple_pattern.match(line)
+            match = COMP_SIMPLE_RE.match(line)
             if match:
-                comp_id = match.group(1)
+                comp_id = intern(match.group(1))
                 if comp_id not in components:
                     components[comp_id] = Component(id=comp_id, label=comp_id)
+                if metrics is not None:
+                    metrics.rule("components.component")
                 continue
             
             # Парсим связь (edge)
-            match = edge_pattern.match(line)
+            match = EDGE_RE.match(line)
             if match:
                 source, arrow, target, label = match.groups()
+                source, target = intern(source), intern(target)
                 # Если стрелка начинается с "<", меняем направление
                 if arrow.startswith("<"):
                     source, target = target, source
@@ -50,7 +52,11 @@ class PlantUMLComponentParser(DiagramParser):
                 if target not in components:
                     components[target] = Component(id=target, label=target)
                 edges.append(Edge(source=source, target=target, label=label.strip() if label else None))
+                if metrics is not None:
+                    metrics.rule("components.edge")
                 continue
             
-            # Остальные строки игнорируем
+            # Остальные строки игнорируем, но учитываем в метриках
+            if metrics is not None:
+                metrics.unparsed_line(line)
         return ComponentDiagram(components=list(components.values()), edges=edges)
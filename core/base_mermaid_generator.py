@@ -1,21 +1,41 @@
+# Разделитель для пакетного экранирования: не меняется при экранировании
+# и не встречается в обычных метках.
+_BULK_SEPARATOR = "\x00"
+
 class BaseMermaidGenerator:
     @staticmethod
     def escape_text(text: str, support_lucid: bool = False) -> str:
         """
         Экранирует специальные символы для Mermaid:
-          - &  -> &amp;
+          - &  -> &amp; (точка с запятой в нём тоже экранируется: &amp#59;)
           - ;  -> #59;
           - последовательности "\n" и реальные переводы строк -> <br>
           - (  -> #40;
           - )  -> #41;
+        Выполняется одной цепочкой замен: ";" заменяется раньше "&", поэтому
+        "&" сразу получает итоговый вид без повторной обработки.
         """
         if support_lucid:
             return text
-        safe = text.replace("&", "&amp;")
-        safe = safe.replace(";", "#59;")
-        safe = safe.replace("\\n", "<br>").replace("\n", "<br>")
-        safe = safe.replace("(", "#40;").replace(")", "#41;")
-        return safe
+        return (text.replace(";", "#59;").replace("&", "&amp#59;")
+                .replace("\\n", "<br>").replace("\n", "<br>")
+                .replace("(", "#40;").replace(")", "#41;"))
+
+    @staticmethod
+    def escape_many(texts, support_lucid: bool = False) -> list:
+        """
+        Экранирует список меток за один вызов escape_text: метки склеиваются
+        через разделитель, экранируются целиком и снова разделяются.
+        Результат совпадает с [escape_text(t) for t in texts].
+        """
+        texts = list(texts)
+        if support_lucid:
+            return texts
+        joined = _BULK_SEPARATOR.join(texts)
+        if joined.count(_BULK_SEPARATOR) != len(texts) - 1:
+            # Пустой список или разделитель в самих метках – экранируем по одной
+            return [BaseMermaidGenerator.escape_text(text) for text in texts]
+        return BaseMermaidGenerator.escape_text(joined).split(_BULK_SEPARATOR)
 
     @staticmethod
     def format_name(name: str) -> str:
@@ -0,0 +1,154 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from core.converters import CONVERTER_VERSION, convert
+
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(plantuml: str, kind: str, version: str = CONVERTER_VERSION) -> str:
+    """Ключ кэша: SHA-256 от версии конвертера, типа диаграммы и исходного текста."""
+    digest = hashlib.sha256()
+    digest.update(f"{version}\0{kind}\0".encode("utf-8"))
+    digest.update(plantuml.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class SQLiteCacheStore:
+    """
+    Постоянный уровень кэша в SQLite. Суммарный размер значений ограничен
+    max_bytes: при превышении удаляются записи, к которым дольше всего
+    не обращались. Файл базы можно разделять между процессами.
+    """
+
+    def __init__(self, path, max_bytes: int = DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        # Покрывающий индекс: подсчёт размера и поиск старых записей не читают сами значения
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed, size)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def close(self):
+        self._conn.close()
+
+
+class ConversionCache:
+    """
+    Кэш результатов parse+generate, адресуемый содержимым (см. cache_key).
+    Первый уровень – LRU в памяти на max_entries записей, второй
+    (необязательный) – SQLiteCacheStore по пути db_path.
+    Потокобезопасен, поэтому один экземпляр можно разделять между сессиями.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MEMORY_ENTRIES, db_path=None,
+                 max_db_bytes: int = DEFAULT_DISK_BYTES):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = SQLiteCacheStore(db_path, max_db_bytes) if db_path else None
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return value
+            if self._disk is not None:
+                value = self._disk.get(key)
+                if value is not None:
+                    self.stats.disk_hits += 1
+                    self._remember(key, value)
+                    return value
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._remember(key, value)
+            if self._disk is not None:
+                self._disk.put(key, value)
+
+    def convert(self, plantuml: str, kind: str) -> str:
+        """Возвращает код Mermaid из кэша или конвертирует и запоминает результат."""
+        key = cache_key(plantuml, kind)
+        value = self.get(key)
+        if value is None:
+            # Конвертация выполняется вне блокировки, чтобы не задерживать другие сессии
+            value = convert(plantuml, kind)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
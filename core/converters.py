@@ -0,0 +1,72 @@
+from components.plantuml_components_parser import PlantUMLComponentParser
+from components.mermaid_components_generator import MermaidGenerator
+from classes.plantuml_class_parser import PlantUMLClassParser
+from classes.mermaid_class_generator import MermaidClassGenerator
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+from sequence.mermaid_sequence_generator import MermaidSequenceGenerator
+
+# Версия конвертера: увеличивается при любом изменении, влияющем на вывод,
+# чтобы результаты в кэшах (см. core.conversion_cache) становились недействительными.
+CONVERTER_VERSION = "1"
+
+# Пары (парсер PlantUML, генератор Mermaid) для каждого типа диаграмм
+CONVERTERS = {
+    "components": (PlantUMLComponentParser, MermaidGenerator),
+    "class": (PlantUMLClassParser, MermaidClassGenerator),
+    "sequence": (PlantUMLSequenceParser, MermaidSequenceGenerator),
+}
+
+DIAGRAM_TYPES = tuple(CONVERTERS)
+
+
+# Общие экземпляры для convert(): парсеры и генераторы не хранят состояния
+# между вызовами (состояние разбора живёт в локальных переменных), поэтому
+# одна пара на тип безопасно используется из многих потоков одновременно.
+_SHARED_CONVERTERS = {
+    kind: (parser_cls(), generator_cls()) for kind, (parser_cls, generator_cls) in CONVERTERS.items()
+}
+
+
+def _unknown_type(kind: str) -> ValueError:
+    return ValueError(f"Unknown diagram type: {kind!r}, expected one of {', '.join(DIAGRAM_TYPES)}")
+
+
+def get_converter(kind: str, instrumentation=None):
+    """
+    Возвращает новые экземпляры (parser, generator) для типа диаграммы.
+    Если задан instrumentation (core.instrumentation.Instrumentation),
+    оба пишут в него свои метрики.
+    """
+    try:
+        parser_cls, generator_cls = CONVERTERS[kind]
+    except KeyError:
+        raise _unknown_type(kind) from None
+    parser, generator = parser_cls(), generator_cls()
+    if instrumentation is not None:
+        parser.instrumentation = generator.instrumentation = instrumentation
+    return parser, generator
+
+
+def _converter(kind: str, instrumentation=None):
+    # Без метрик используется общая пара: экземпляры не создаются на каждый вызов
+    if instrumentation is not None:
+        return get_converter(kind, instrumentation)
+    try:
+        return _SHARED_CONVERTERS[kind]
+    except KeyError:
+        raise _unknown_type(kind) from None
+
+
+def convert(plantuml: str, kind: str, instrumentation=None) -> str:
+    """
+    Конвертирует текст PlantUML указанного типа в код Mermaid.
+    Потокобезопасна: вызовы из разных потоков не влияют друг на друга.
+    """
+    parser, generator = _converter(kind, instrumentation)
+    return generator.generate(parser.parse(plantuml))
+
+
+def convert_file(path, kind: str, encoding: str = "utf-8", instrumentation=None) -> str:
+    """Конвертирует файл PlantUML, читая его построчно (см. DiagramParser.parse_file)."""
+    parser, generator = _converter(kind, instrumentation)
+    return generator.generate(parser.parse_file(path, encoding))
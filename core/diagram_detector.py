@@ -0,0 +1,77 @@
+import re
+from itertools import islice
+
+from core.converters import get_converter
+from core.diagram_parser import clean_lines
+
+# Сколько первых строк/символов просматривается при определении типа
+DETECT_MAX_LINES = 200
+DETECT_MAX_CHARS = 64 * 1024
+
+# Ведущие ключевые слова, однозначно определяющие тип диаграммы
+KEYWORD_TYPES = {
+    "component": "components",
+    "class": "class",
+    "interface": "class",
+    "participant": "sequence",
+    "actor": "sequence",
+    "activate": "sequence",
+    "deactivate": "sequence",
+    "alt": "sequence",
+    "loop": "sequence",
+    "par": "sequence",
+}
+# Сообщение последовательности: "A -> B: text" или "A ->> B: text"
+SEQUENCE_MESSAGE_RE = re.compile(r'^\w+\s*->>?\s*\w+\s*:')
+# Наследование/реализация в классовой диаграмме
+CLASS_RELATION_RE = re.compile(r'<\|(?:--|\.\.)|\s(?:extends|implements)\s', re.IGNORECASE)
+# Стрелки, которые встречаются только в классовых диаграммах
+CLASS_ARROW_RE = re.compile(r'\s(?:\.\.>|o--|\*--)\s|^\w+\s+"')
+
+
+def detect_diagram_type(plantuml: str, max_lines: int = DETECT_MAX_LINES):
+    """
+    Определяет тип диаграммы ("components", "class" или "sequence") по началу текста.
+    Просматривается не больше max_lines значимых строк (и DETECT_MAX_CHARS символов);
+    первое однозначное ключевое слово или стрелка сразу даёт ответ.
+    Если таких нет, используются косвенные признаки (стрелки -->, <--, ..>).
+    Возвращает None, если тип определить не удалось.
+    """
+    prefix = plantuml[:DETECT_MAX_CHARS].splitlines()
+    class_hint = False
+    component_hint = False
+    for line in islice(clean_lines(prefix), max_lines):
+        keyword = line.split(None, 1)[0].lower()
+        kind = KEYWORD_TYPES.get(keyword)
+        if kind is not None:
+            return kind
+        if CLASS_RELATION_RE.search(line):
+            return "class"
+        if SEQUENCE_MESSAGE_RE.match(line):
+            return "sequence"
+        if CLASS_ARROW_RE.search(line):
+            class_hint = True
+        elif "-->" in line or "<--" in line:
+            component_hint = True
+    if class_hint:
+        return "class"
+    if component_hint:
+        return "components"
+    return None
+
+
+def detect_file_type(path, encoding: str = "utf-8"):
+    """Определяет тип диаграммы в файле, читая только его начало."""
+    with open(path, encoding=encoding) as fp:
+        return detect_diagram_type(fp.read(DETECT_MAX_CHARS))
+
+
+def detect_converter(plantuml: str):
+    """
+    Возвращает пару (parser, generator) для автоматически определённого
+    типа диаграммы или None, если тип определить не удалось.
+    """
+    kind = detect_diagram_type(plantuml)
+    if kind is None:
+        return None
+    return get_converter(kind)
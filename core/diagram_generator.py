@@ -1,6 +1,38 @@
 from abc import ABC, abstractmethod
 
 class DiagramGenerator(ABC):
+    # Необязательный сборщик метрик (core.instrumentation.Instrumentation):
+    # время стадии "generate" и число строк Mermaid
+    instrumentation = None
+
     @abstractmethod
+    def iter_lines(self, diagram):
+        """Возвращает строки кода Mermaid по одной (без символов перевода строки)."""
+
+    def write(self, diagram, fp):
+        """
+        Пишет код Mermaid в текстовый поток fp построчно, не собирая его
+        целиком в памяти. Результат совпадает с generate().
+        """
+        metrics = self.instrumentation
+        if metrics is None:
+            self._write_lines(self.iter_lines(diagram), fp)
+            return
+        with metrics.stage("generate"):
+            self._write_lines(metrics.count_lines("generate", self.iter_lines(diagram)), fp)
+
     def generate(self, diagram) -> str:
-        pass
+        metrics = self.instrumentation
+        if metrics is None:
+            return "\n".join(self.iter_lines(diagram))
+        with metrics.stage("generate"):
+            return "\n".join(metrics.count_lines("generate", self.iter_lines(diagram)))
+
+    @staticmethod
+    def _write_lines(lines, fp):
+        lines = iter(lines)
+        for line in lines:
+            fp.write(line)
+            break
+        for line in lines:
+            fp.write("\n" + line)
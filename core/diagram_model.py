@@ -1,13 +1,18 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+from core.slotted import slotted_dataclass
+
+# Элементы диаграмм – слотовые dataclass без __dict__, чтобы большие модели
+# занимали меньше памяти. Идентификаторы парсеры интернируют (sys.intern).
+
 # Модель для components diagram (оставляем без изменений)
-@dataclass
+@slotted_dataclass
 class Component:
     id: str
     label: str
 
-@dataclass
+@slotted_dataclass
 class Edge:
     source: str
     target: str
@@ -19,7 +24,7 @@ class ComponentDiagram:
     edges: List[Edge]
 
 # Модель для классовой диаграммы
-@dataclass
+@slotted_dataclass
 class ClassRelationship:
     source: str
     target: str
@@ -29,7 +34,7 @@ class ClassRelationship:
     target_cardinality: Optional[str] = ""
     arrow: Optional[str] = ""  # Новый параметр для хранения типа стрелки (например, "-->" или "o--")
 
-@dataclass
+@slotted_dataclass
 class ClassEntity:
     name: str
     type: str  # "class" или "interface"
@@ -1,7 +1,60 @@
 # diagram_parser.py
+import mmap
+import os
 from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
+
+def clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Лениво очищает строки PlantUML: обрезает пробелы по краям,
+    пропускает пустые строки и директивы @startuml/@enduml.
+    """
+    for line in lines:
+        line = line.strip()
+        if line and line[0] != '@':
+            yield line
+
+
+def iter_file_lines(path, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Построчно читает файл через mmap, не загружая его целиком в память.
+    Файл режется по '\\n' (кодировка должна быть совместима с ASCII), а каждый
+    кусок – str.splitlines(), поэтому строки совпадают с DiagramParser.parse
+    при любых окончаниях строк ('\\r\\n', '\\r', '\\x0b', U+2028, ...).
+    Файл без '\\n' (окончания '\\r') читается одним куском.
+    """
+    with open(path, "rb") as fp:
+        # mmap не умеет отображать пустые файлы
+        if os.fstat(fp.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for raw_line in iter(mapped.readline, b""):
+                yield from raw_line.decode(encoding).splitlines()
+
 
 class DiagramParser(ABC):
-    @abstractmethod
+    # Необязательный сборщик метрик (core.instrumentation.Instrumentation):
+    # время и число строк стадии "parse", счётчики правил, нераспознанные строки
+    instrumentation = None
+
     def parse(self, plantuml: str):
-        pass
+        return self._parse_lines(plantuml.splitlines())
+
+    @abstractmethod
+    def parse_stream(self, lines: Iterable[str]):
+        """
+        Разбирает диаграмму из итерируемого источника строк (список,
+        открытый текстовый файл, генератор). Строки читаются лениво,
+        поэтому пиковая память определяется размером модели, а не текста.
+        """
+
+    def parse_file(self, path, encoding: str = "utf-8"):
+        return self._parse_lines(iter_file_lines(path, encoding))
+
+    def _parse_lines(self, lines):
+        metrics = self.instrumentation
+        if metrics is None:
+            return self.parse_stream(lines)
+        with metrics.stage("parse"):
+            return self.parse_stream(metrics.count_lines("parse", lines))
@@ -0,0 +1,234 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from core.diagram_model import ClassDiagram, ComponentDiagram
+from core.diagram_parser import clean_lines
+from core.sequence_model import SequenceDiagram, Participant
+from components.plantuml_components_parser import PlantUMLComponentParser, COMP_QUOTED_RE
+from components.mermaid_components_generator import MermaidGenerator
+from classes.plantuml_class_parser import (
+    PlantUMLClassParser, BLOCK_DECL_RE, INLINE_DECL_RE, split_statements as split_class_statements
+)
+from classes.mermaid_class_generator import MermaidClassGenerator
+from sequence.plantuml_sequence_parser import (
+    PlantUMLSequenceParser, DECLARATION_PREFIX_RE, split_statements as split_sequence_statements
+)
+from sequence.mermaid_sequence_generator import MermaidSequenceGenerator, format_mermaid_name
+
+
+@dataclass
+class Fragment:
+    """
+    Результат разбора одного оператора верхнего уровня вместе с готовыми
+    строками Mermaid. defines=True означает, что оператор объявляет сущности
+    (и перезаписывает их), иначе сущности лишь добавляются, если их ещё нет.
+    """
+    defines: bool = False
+    entities: list = field(default_factory=list)
+    items: list = field(default_factory=list)
+    lines: List[str] = field(default_factory=list)
+    mentions: List[str] = field(default_factory=list)
+
+
+def _merge_entities(entities: dict, fragment: Fragment, key):
+    for entity in fragment.entities:
+        name = key(entity)
+        if fragment.defines or name not in entities:
+            entities[name] = entity
+
+
+def _render_cached(cache: dict, previous: dict, key, render):
+    value = previous.get(key)
+    if value is None:
+        value = render()
+    cache[key] = value
+    return value
+
+
+class ComponentsStrategy:
+    def __init__(self):
+        self.parser = PlantUMLComponentParser()
+        self.generator = MermaidGenerator()
+        self._component_lines = {}
+
+    def split(self, lines):
+        return [(line,) for line in lines]
+
+    def parse(self, statement) -> Fragment:
+        diagram = self.parser.parse_stream(statement)
+        return Fragment(
+            defines=bool(COMP_QUOTED_RE.match(statement[0])),
+            entities=diagram.components,
+            items=diagram.edges,
+            lines=[self.generator.render_edge(edge) for edge in diagram.edges],
+        )
+
+    def assemble(self, fragments):
+        components = {}
+        edges = []
+        edge_lines = []
+        for fragment in fragments:
+            _merge_entities(components, fragment, lambda comp: comp.id)
+            edges.extend(fragment.items)
+            edge_lines.extend(fragment.lines)
+        previous, self._component_lines = self._component_lines, {}
+        lines = ["flowchart LR"]
+        for comp in components.values():
+            lines.append(_render_cached(
+                self._component_lines, previous, (comp.id, comp.label),
+                lambda comp=comp: self.generator.render_component(comp)
+            ))
+        lines.extend(edge_lines)
+        diagram = ComponentDiagram(components=list(components.values()), edges=edges)
+        return diagram, "\n".join(lines)
+
+
+class ClassStrategy:
+    def __init__(self):
+        self.parser = PlantUMLClassParser()
+        self.generator = MermaidClassGenerator()
+        self._entity_lines = {}
+
+    def split(self, lines):
+        return split_class_statements(lines)
+
+    def parse(self, statement) -> Fragment:
+        first = statement[0]
+        diagram = self.parser.parse_stream(statement)
+        return Fragment(
+            defines=bool(BLOCK_DECL_RE.match(first) or INLINE_DECL_RE.match(first)),
+            entities=diagram.entities,
+            items=diagram.relationships,
+            lines=[self.generator.render_relationship(rel) for rel in diagram.relationships],
+        )
+
+    def assemble(self, fragments):
+        entities = {}
+        relationships = []
+        lines = ["classDiagram"]
+        for fragment in fragments:
+            _merge_entities(entities, fragment, lambda ent: ent.name)
+            relationships.extend(fragment.items)
+            lines.extend(fragment.lines)
+        previous, self._entity_lines = self._entity_lines, {}
+        for ent in entities.values():
+            lines.extend(_render_cached(
+                self._entity_lines, previous, (ent.name, ent.type, ent.body),
+                lambda ent=ent: self.generator.render_entity(ent)
+            ))
+        diagram = ClassDiagram(entities=list(entities.values()), relationships=relationships)
+        return diagram, "\n".join(lines)
+
+
+class SequenceStrategy:
+    def __init__(self):
+        self.parser = PlantUMLSequenceParser()
+        self.generator = MermaidSequenceGenerator()
+        self._names = {}
+
+    def split(self, lines):
+        return split_sequence_statements(lines)
+
+    def parse(self, statement) -> Fragment:
+        diagram = self.parser.parse_stream(statement)
+        if DECLARATION_PREFIX_RE.match(statement[0]):
+            # Объявление: entities – актёры, mentions – явно объявленные участники
+            return Fragment(
+                defines=True,
+                entities=diagram.actors,
+                mentions=[part.name for part in diagram.participants],
+            )
+        # События: участники, упомянутые в них, в порядке первого появления
+        return Fragment(
+            items=diagram.events,
+            lines=self.generator.process_events(diagram.events),
+            mentions=[part.name for part in diagram.participants],
+        )
+
+    def assemble(self, fragments):
+        actors = {}
+        participants = {}
+        mentioned = {}
+        events = []
+        raw_lines = []
+        for fragment in fragments:
+            if fragment.defines:
+                for actor in fragment.entities:
+                    actors[actor.name] = actor
+                for name in fragment.mentions:
+                    participants[name] = Participant(name=name)
+            else:
+                mentioned.update(dict.fromkeys(fragment.mentions))
+                events.extend(fragment.items)
+                raw_lines.extend(fragment.lines)
+        for name in mentioned:
+            if name not in actors and name not in participants:
+                participants[name] = Participant(name=name)
+
+        previous, self._names = self._names, {}
+        lines = ["sequenceDiagram"]
+        for actor in actors.values():
+            name = _render_cached(self._names, previous, actor.name,
+                                  lambda actor=actor: format_mermaid_name(actor.name))
+            lines.append(f"actor {name}")
+        for part in participants.values():
+            name = _render_cached(self._names, previous, part.name,
+                                  lambda part=part: format_mermaid_name(part.name))
+            lines.append(f"participant {name}")
+        lines.extend(self.generator.filter_deactivations(raw_lines))
+        diagram = SequenceDiagram(
+            actors=list(actors.values()),
+            participants=list(participants.values()),
+            events=events
+        )
+        return diagram, "\n".join(lines)
+
+
+STRATEGIES = {
+    "components": ComponentsStrategy,
+    "class": ClassStrategy,
+    "sequence": SequenceStrategy,
+}
+
+
+class IncrementalConverter:
+    """
+    Конвертер для многократно редактируемого текста одной диаграммы.
+    Текст делится на операторы верхнего уровня (строки, блоки классов,
+    регионы alt/loop/par); разобранные и отрендеренные фрагменты
+    запоминаются по содержимому оператора. При следующем вызове заново
+    разбираются только изменившиеся операторы, а модель (self.diagram)
+    и итоговый код собираются из готовых фрагментов.
+    """
+
+    def __init__(self, kind: str):
+        if kind not in STRATEGIES:
+            raise ValueError(f"Unknown diagram type: {kind!r}, expected one of {', '.join(STRATEGIES)}")
+        self.kind = kind
+        self.diagram = None
+        # Статистика последнего вызова convert()
+        self.reparsed = 0
+        self.reused = 0
+        self._strategy = STRATEGIES[kind]()
+        self._fragments = {}
+
+    def convert(self, plantuml: str) -> str:
+        statements = self._strategy.split(list(clean_lines(plantuml.splitlines())))
+        previous, current = self._fragments, {}
+        fragments = []
+        reparsed = 0
+        for statement in statements:
+            fragment = current.get(statement)
+            if fragment is None:
+                fragment = previous.get(statement)
+                if fragment is None:
+                    fragment = self._strategy.parse(statement)
+                    reparsed += 1
+                current[statement] = fragment
+            fragments.append(fragment)
+        # Храним только фрагменты текущей версии, чтобы память не росла от правок
+        self._fragments = current
+        self.reparsed = reparsed
+        self.reused = len(statements) - reparsed
+        self.diagram, mermaid_code = self._strategy.assemble(fragments)
+        return mermaid_code
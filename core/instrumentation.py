@@ -0,0 +1,81 @@
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+DEFAULT_MAX_UNPARSED = 100
+
+
+class Instrumentation:
+    """
+    Сборщик метрик конвертации: время и число строк по стадиям (parse,
+    generate), счётчики сработавших правил разбора и ограниченный буфер
+    нераспознанных строк (хранятся последние max_unparsed, считаются все).
+
+    Подключается к парсерам и генераторам через атрибут instrumentation
+    (см. core.converters.get_converter). По умолчанию он равен None,
+    и тогда горячие циклы платят лишь за одну проверку на None.
+    hook(stage, seconds) вызывается по завершении каждой стадии – например,
+    для отправки времени в систему метрик.
+    Экземпляр не потокобезопасен: заводите отдельный на каждый поток.
+    """
+
+    def __init__(self, max_unparsed: int = DEFAULT_MAX_UNPARSED, hook=None):
+        self.hook = hook
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.lines = Counter()
+        self.rules = Counter()
+        self.unparsed = deque(maxlen=max_unparsed)
+        self.unparsed_total = 0
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] += elapsed
+            self.calls[name] += 1
+            if self.hook is not None:
+                self.hook(name, elapsed)
+
+    def count_lines(self, stage: str, lines):
+        """Пропускает строки насквозь, считая их в self.lines[stage]."""
+        count = 0
+        try:
+            for line in lines:
+                count += 1
+                yield line
+        finally:
+            self.lines[stage] += count
+
+    def rule(self, name: str):
+        self.rules[name] += 1
+
+    def unparsed_line(self, line: str):
+        self.unparsed_total += 1
+        self.unparsed.append(line)
+
+    def summary(self) -> dict:
+        """Сводка в виде JSON-совместимого словаря."""
+        return {
+            "stages": {
+                name: {"seconds": self.seconds[name], "calls": self.calls[name], "lines": self.lines[name]}
+                for name in self.calls
+            },
+            "rules": dict(self.rules),
+            "unparsed": {"total": self.unparsed_total, "lines": list(self.unparsed)},
+        }
+
+    def flat_metrics(self, prefix: str = "") -> dict:
+        """Плоский словарь {имя метрики: число} для систем вроде StatsD/Prometheus."""
+        metrics = {}
+        for name in self.calls:
+            metrics[f"{prefix}{name}.seconds"] = self.seconds[name]
+            metrics[f"{prefix}{name}.calls"] = self.calls[name]
+            metrics[f"{prefix}{name}.lines"] = self.lines[name]
+        for name, count in self.rules.items():
+            metrics[f"{prefix}rules.{name}"] = count
+        metrics[f"{prefix}unparsed"] = self.unparsed_total
+        return metrics
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+from core.converters import CONVERTER_VERSION
+
+# 2: пути хранятся относительно каталога манифеста
+MANIFEST_FORMAT = 2
+# Файл, изменённый позже этого срока до записи в манифест, мог измениться ещё
+# раз в пределах того же значения mtime; для него размер и mtime не доверяются.
+RACY_WINDOW_NS = 2 * 10**9
+
+
+def resolve_path(path) -> str:
+    """Абсолютный путь: записи манифеста не зависят от рабочего каталога запуска."""
+    return os.path.abspath(path)
+
+
+def file_digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Состояние исходного файла на момент последней успешной конвертации."""
+    size: int
+    mtime_ns: int
+    sha256: str
+    converter_version: str
+    kind: str
+    output: str
+
+
+@dataclass
+class StaleSource:
+    source: str
+    output: str
+    kind: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    # Выход предыдущей конвертации, если он лежал по другому пути
+    previous_output: Optional[str] = None
+
+
+class ConversionManifest:
+    """
+    Манифест инкрементальной конвертации: для каждого исходного файла –
+    размер, mtime, SHA-256 содержимого, версия конвертера, тип и путь выхода.
+
+    Файл считается актуальным, если совпадают версия конвертера, тип
+    и путь выхода, выход существует, а размер и mtime не изменились.
+    Только при изменении размера/mtime файл читается и хэшируется:
+    совпавший хэш (например, после checkout) лишь обновляет запись.
+
+    В памяти записи хранятся по абсолютным путям (resolve_path), в файле –
+    относительно каталога манифеста, поэтому запуск из другого каталога
+    или в другом checkout видит те же файлы.
+    """
+
+    def __init__(self, path, entries: dict = None):
+        self.path = path
+        self.base_dir = os.path.dirname(resolve_path(path))
+        self.entries = entries or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path) -> "ConversionManifest":
+        try:
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return cls(path)
+        if data.get("format") != MANIFEST_FORMAT:
+            # Манифест другого формата: всё будет сконвертировано заново
+            return cls(path)
+        manifest = cls(path)
+        for source, entry in data["entries"].items():
+            entry = ManifestEntry(**entry)
+            entry.output = manifest._from_file(entry.output)
+            manifest.entries[manifest._from_file(source)] = entry
+        return manifest
+
+    def save(self):
+        """Атомарно записывает манифест, если он изменился."""
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump({
+                "format": MANIFEST_FORMAT,
+                "entries": {
+                    self._to_file(source): dict(asdict(entry), output=self._to_file(entry.output))
+                    for source, entry in self.entries.items()
+                },
+            }, fp, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def stale(self, tasks) -> List[StaleSource]:
+        """
+        Возвращает устаревшие файлы из задач (source, output, kind),
+        заодно освежая размер и mtime записей, содержимое которых не изменилось.
+        Недоступный файл (нет на диске, нет прав) тоже считается устаревшим:
+        его конвертация завершится ошибкой, как и без манифеста.
+        """
+        stale = []
+        for source, output, kind in tasks:
+            entry = self.entries.get(resolve_path(source))
+            output_key = resolve_path(output)
+            previous_output = entry.output if entry is not None and entry.output != output_key else None
+            try:
+                stat = os.stat(source)
+                if (entry is not None and entry.converter_version == CONVERTER_VERSION
+                        and entry.kind == kind and entry.output == output_key and os.path.exists(output)):
+                    if entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                        continue
+                    digest = file_digest(source)
+                    if digest == entry.sha256:
+                        self._touch(entry, stat)
+                        continue
+                else:
+                    digest = file_digest(source)
+            except OSError:
+                # Состояние неизвестно: если файл всё же сконвертируется,
+                # запись не совпадёт ни по размеру, ни по хэшу
+                stale.append(StaleSource(source, output, kind, -1, 0, "", previous_output))
+                continue
+            stale.append(StaleSource(source, output, kind, stat.st_size, stat.st_mtime_ns, digest, previous_output))
+        return stale
+
+    def orphans(self, seen) -> List[str]:
+        """
+        Исходные файлы манифеста (абсолютные пути), которых больше нет на диске
+        (seen – файлы текущего запуска). Файлы, лишь не попавшие в этот запуск,
+        не трогаются.
+        """
+        seen = {resolve_path(source) for source in seen}
+        return [source for source in self.entries if source not in seen and not os.path.exists(source)]
+
+    def record(self, item: StaleSource):
+        entry = ManifestEntry(item.size, item.mtime_ns, item.sha256, CONVERTER_VERSION, item.kind,
+                              resolve_path(item.output))
+        self.entries[resolve_path(item.source)] = entry
+        self._touch(entry, None)
+
+    def forget(self, source: str) -> Optional[ManifestEntry]:
+        entry = self.entries.pop(resolve_path(source), None)
+        if entry is not None:
+            self.dirty = True
+        return entry
+
+    def _from_file(self, path: str) -> str:
+        return os.path.normpath(os.path.join(self.base_dir, path))
+
+    def _to_file(self, path: str) -> str:
+        try:
+            return os.path.relpath(path, self.base_dir)
+        except ValueError:
+            # Windows: другой диск
+            return path
+
+    def _touch(self, entry: ManifestEntry, stat):
+        if stat is not None:
+            entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+        if entry.mtime_ns > time.time_ns() - RACY_WINDOW_NS:
+            # Слишком свежий файл: в следующий раз он будет захэширован
+            entry.mtime_ns = 0
+        self.dirty = True
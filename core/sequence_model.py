@@ -1,45 +1,51 @@
 from dataclasses import dataclass
 from typing import List, Optional, Union
 
-@dataclass
+from core.slotted import slotted_dataclass
+
+# События и участники – слотовые dataclass без __dict__: трассы из сотен
+# тысяч событий занимают заметно меньше памяти. Имена участников парсер
+# интернирует, поэтому все события ссылаются на одни и те же строки.
+
+@slotted_dataclass
 class Participant:
     name: str
 
-@dataclass
+@slotted_dataclass
 class Actor:
     name: str
 
-@dataclass
+@slotted_dataclass
 class Message:
     sender: str
     receiver: str
     message: str
 
-@dataclass
+@slotted_dataclass
 class Activate:
     participant: str
  
-@dataclass
+@slotted_dataclass
 class Deactivate:
     participant: str
 
-@dataclass
+@slotted_dataclass
 class Note:
     participant: Optional[str]  # если None – глобальная заметка
     message: str
 
 # Контрольные блоки:
-@dataclass
+@slotted_dataclass
 class AltBlock:
     # Список альтернатив: каждая альтернатива – кортеж (condition, events)
     alternatives: List[tuple]
 
-@dataclass
+@slotted_dataclass
 class LoopBlock:
     condition: str
     events: List[Union['Message', 'Activate', 'Deactivate', 'Note', 'AltBlock', 'LoopBlock', 'ParBlock']]
 
-@dataclass
+@slotted_dataclass
 class ParBlock:
     # Каждая ветка – кортеж (branch_label, events)
     branches: List[tuple]
@@ -49,4 +55,4 @@ class ParBlock:
 class SequenceDiagram:
     actors: List[Actor]
     participants: List[Participant]
-    events: List[Union[Message, Activate, Deactivate, Note, AltBlock, LoopBlock, ParBlock]]
+    events: List[Union[Message, Activate, Deactivate, Note, AltBlock, LoopBlock, ParBlock]]  # или core.sequence_table.EventTable
@@ -0,0 +1,181 @@
+from array import array
+
+from core.sequence_model import (
+    Message, Activate, Deactivate, Note, AltBlock, LoopBlock, ParBlock
+)
+
+# Коды видов строк таблицы (колонка kinds)
+MESSAGE = 0
+ACTIVATE = 1
+DEACTIVATE = 2
+NOTE = 3
+ALT = 4
+LOOP = 5
+PAR = 6
+ELSE = 7
+AND = 8
+END = 9
+
+NO_ID = -1
+
+
+def _branch_rows(block):
+    """
+    События веток блока вперемешку с разделителями (ELSE/AND, метка).
+    Первая метка и закрывающий END в последовательность не входят.
+    """
+    if isinstance(block, AltBlock):
+        yield from block.alternatives[0][1]
+        for cond, branch in block.alternatives[1:]:
+            yield ELSE, cond
+            yield from branch
+    elif isinstance(block, LoopBlock):
+        yield from block.events
+    else:
+        yield from block.branches[0][1]
+        for label, branch in block.branches[1:]:
+            yield AND, label
+            yield from branch
+
+
+def _block_opening(block):
+    if isinstance(block, AltBlock):
+        return ALT, block.alternatives[0][0]
+    if isinstance(block, LoopBlock):
+        return LOOP, block.condition
+    return PAR, block.branches[0][0]
+
+
+class EventTable:
+    """
+    Колоночное хранение событий диаграммы последовательности: одна строка
+    таблицы на событие или служебную строку блока, в порядке вывода.
+    Блок alt/loop/par записывается как строка открытия (ALT/LOOP/PAR с меткой),
+    события веток, строки ELSE/AND с меткой следующей ветки и строка END.
+
+    Колонки (array):
+      kinds     – код вида строки (MESSAGE, ACTIVATE, ..., END);
+      senders   – id имени отправителя сообщения или участника activate/deactivate/note;
+      receivers – id имени получателя сообщения;
+      texts     – индекс текста сообщения, заметки или метки блока в strings;
+      depths    – число блоков, внутри которых находится строка;
+      parents   – номер строки открытия ближайшего охватывающего блока.
+    Строки ELSE/AND/END относятся к своему блоку: parent – его строка открытия,
+    depth – та же, что у строки открытия.
+    Id имён – индексы в таблице names, где каждое имя участника хранится один раз;
+    тексты почти всегда уникальны, поэтому strings их не дедуплицирует.
+    NO_ID означает отсутствие значения.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.senders = array("i")
+        self.receivers = array("i")
+        self.texts = array("i")
+        self.depths = array("I")
+        self.parents = array("i")
+        self.names = []
+        self.strings = []
+        self._name_ids = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def name_id(self, name) -> int:
+        """Возвращает id имени в таблице names, добавляя его при необходимости."""
+        if name is None:
+            return NO_ID
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def append_row(self, kind: int, sender=None, receiver=None, text=None, depth: int = 0, parent: int = NO_ID):
+        name_id = self.name_id
+        self.kinds.append(kind)
+        self.senders.append(name_id(sender))
+        self.receivers.append(name_id(receiver))
+        if text is None:
+            self.texts.append(NO_ID)
+        else:
+            self.texts.append(len(self.strings))
+            self.strings.append(text)
+        self.depths.append(depth)
+        self.parents.append(parent)
+
+    @classmethod
+    def from_events(cls, events) -> "EventTable":
+        table = cls()
+        table.extend(events)
+        return table
+
+    def extend(self, events):
+        """
+        Дописывает в конец таблицы дерево событий объектной модели.
+        Обход итеративный, как в MermaidSequenceGenerator.iter_events.
+        """
+        append_row = self.append_row
+        stack = [iter(events)]
+        # Строки открытия блоков, внутри которых находится обход
+        openings = []
+        while stack:
+            depth = len(openings)
+            parent = openings[-1] if openings else NO_ID
+            for ev in stack[-1]:
+                if isinstance(ev, Message):
+                    append_row(MESSAGE, ev.sender, ev.receiver, ev.message, depth, parent)
+                elif isinstance(ev, Activate):
+                    append_row(ACTIVATE, ev.participant, depth=depth, parent=parent)
+                elif isinstance(ev, Deactivate):
+                    append_row(DEACTIVATE, ev.participant, depth=depth, parent=parent)
+                elif isinstance(ev, Note):
+                    append_row(NOTE, ev.participant, text=ev.message, depth=depth, parent=parent)
+                elif isinstance(ev, tuple):
+                    # Разделитель веток (ELSE/AND, метка) – на уровне строки открытия
+                    append_row(ev[0], text=ev[1], depth=depth - 1, parent=parent)
+                elif isinstance(ev, (AltBlock, LoopBlock, ParBlock)):
+                    kind, label = _block_opening(ev)
+                    openings.append(len(self.kinds))
+                    append_row(kind, text=label, depth=depth, parent=parent)
+                    stack.append(_branch_rows(ev))
+                    break
+            else:
+                stack.pop()
+                if stack:
+                    append_row(END, depth=depth - 1, parent=openings.pop())
+
+    def to_events(self) -> list:
+        """Восстанавливает дерево событий объектной модели."""
+        names = self.names
+        strings = self.strings
+        events = []
+        # Кадры открытых блоков: (список веток или None для loop, события родителя)
+        stack = []
+        for kind, sender, receiver, text in zip(self.kinds, self.senders, self.receivers, self.texts):
+            if kind == MESSAGE:
+                events.append(Message(sender=names[sender], receiver=names[receiver], message=strings[text]))
+            elif kind == ACTIVATE:
+                events.append(Activate(participant=names[sender]))
+            elif kind == DEACTIVATE:
+                events.append(Deactivate(participant=names[sender]))
+            elif kind == NOTE:
+                participant = None if sender == NO_ID else names[sender]
+                events.append(Note(participant=participant, message=strings[text]))
+            elif kind == END:
+                events = stack.pop()[1]
+            elif kind in (ELSE, AND):
+                events = []
+                stack[-1][0].append((strings[text], events))
+            else:
+                # Блок добавляется в родителя сразу: до его END туда ничего не попадёт
+                branch = []
+                if kind == LOOP:
+                    parts = None
+                    events.append(LoopBlock(condition=strings[text], events=branch))
+                else:
+                    parts = [(strings[text], branch)]
+                    events.append(AltBlock(alternatives=parts) if kind == ALT else ParBlock(branches=parts))
+                stack.append((parts, events))
+                events = branch
+        return events
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, fields
+
+
+def slotted_dataclass(cls=None, **kwargs):
+    """
+    dataclass с __slots__ вместо __dict__ у экземпляров (аналог
+    dataclass(slots=True), который появился только в Python 3.10).
+    Значения по умолчанию хранятся в __init__, поэтому атрибуты класса
+    с ними можно убрать и заменить слотами.
+    """
+    def wrap(cls):
+        cls = dataclass(cls, **kwargs)
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(f.name for f in fields(cls))
+        for name in field_names:
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+        cls_dict["__slots__"] = field_names
+        return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
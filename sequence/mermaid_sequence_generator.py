@@ -5,6 +5,9 @@ from core.sequence_model import (
     AltBlock, LoopBlock, ParBlock
 )
 from core.diagram_generator import DiagramGenerator
+from core.sequence_table import (
+    EventTable, MESSAGE, ACTIVATE, DEACTIVATE, NOTE, ALT, LOOP, PAR, ELSE, AND, END, NO_ID
+)
 from core.base_mermaid_generator import BaseMermaidGenerator
 
 def escape_sequence_text(text: str) -> str:
@@ -16,80 +19,168 @@ def format_mermaid_name(name: str) -> str:
 def format_condition(text: str) -> str:
     return BaseMermaidGenerator.format_condition(text)
 
+class FormattedNames(dict):
+    """
+    Таблица отформатированных имён участников на одну диаграмму:
+    каждое имя проходит format_mermaid_name один раз, в том числе имена,
+    которые встречаются только в событиях (они форматируются при первом обращении).
+    """
+    def __missing__(self, name: str) -> str:
+        formatted = self[name] = format_mermaid_name(name)
+        return formatted
+
+def _block_items(block):
+    """
+    Разворачивает блок alt/loop/par в плоскую последовательность:
+    служебные строки (str) вперемешку с событиями веток.
+    Вложенные блоки возвращаются как есть и раскрываются вызывающей стороной.
+    """
+    if isinstance(block, AltBlock):
+        first_cond, first_branch = block.alternatives[0]
+        yield "alt " + format_condition(first_cond)
+        yield from first_branch
+        for cond, branch in block.alternatives[1:]:
+            yield "else " + format_condition(cond)
+            yield from branch
+    elif isinstance(block, LoopBlock):
+        yield "loop " + format_condition(block.condition)
+        yield from block.events
+    else:
+        first_label, first_branch = block.branches[0]
+        yield "par " + format_condition(first_label)
+        yield from first_branch
+        for label, branch in block.branches[1:]:
+            yield "and " + format_condition(label)
+            yield from branch
+    yield "end"
+
 class MermaidSequenceGenerator(DiagramGenerator):
-    def generate(self, diagram: SequenceDiagram) -> str:
-        lines = ["sequenceDiagram"]
+    def iter_lines(self, diagram: SequenceDiagram):
+        yield "sequenceDiagram"
+        names = FormattedNames()
 
         # Выводим актёров
         for actor in diagram.actors:
-            lines.append(f"actor {format_mermaid_name(actor.name)}")
+            yield f"actor {names[actor.name]}"
         # Выводим участников
         for part in diagram.participants:
-            lines.append(f"participant {format_mermaid_name(part.name)}")
+            yield f"participant {names[part.name]}"
+
+        # Состояние активаций ведётся прямо при обходе событий, без второго прохода
+        if isinstance(diagram.events, EventTable):
+            yield from self.iter_table(diagram.events, names, active={})
+        else:
+            yield from self.iter_events(diagram.events, names, active={})
+
+    def process_events(self, events, names: FormattedNames = None) -> list:
+        """Преобразует дерево событий в список строк Mermaid (см. iter_events)."""
+        return list(self.iter_events(events, names))
 
-        def process_events(events):
-            out = []
-            for ev in events:
-                if isinstance(ev, Message):
+    def iter_events(self, events, names: FormattedNames = None, active: dict = None):
+        """
+        Преобразует дерево событий в строки Mermaid и возвращает их по одной.
+        Обход итеративный: вложенные блоки разворачиваются в плоские
+        итераторы (_block_items) и кладутся в стек, поэтому время линейно,
+        а глубина вложенности не ограничена лимитом рекурсии.
+        names – таблица уже отформатированных имён (см. FormattedNames).
+        active – словарь состояния активаций {имя: активен ли}; если он передан,
+        deactivate для неактивного участника пропускается (как filter_deactivations),
+        иначе события выводятся без фильтрации.
+        """
+        if names is None:
+            names = FormattedNames()
+        stack = [iter(events)]
+        while stack:
+            for ev in stack[-1]:
+                if isinstance(ev, str):
+                    # Служебные строки блоков: alt/else/loop/par/and/end
+                    yield ev
+                elif isinstance(ev, Message):
                     msg = escape_sequence_text(ev.message)
-                    out.append(f"{format_mermaid_name(ev.sender)}->>{format_mermaid_name(ev.receiver)}: {msg}")
+                    yield f"{names[ev.sender]}->>{names[ev.receiver]}: {msg}"
                 elif isinstance(ev, Activate):
-                    out.append(f"activate {format_mermaid_name(ev.participant)}")
+                    name = names[ev.participant]
+                    if active is not None:
+                        active[name] = True
+                    yield f"activate {name}"
                 elif isinstance(ev, Deactivate):
-                    out.append(f"deactivate {format_mermaid_name(ev.participant)}")
+                    name = names[ev.participant]
+                    if active is not None:
+                        if not active.get(name, False):
+                            continue
+                        active[name] = False
+                    yield f"deactivate {name}"
                 elif isinstance(ev, Note):
                     note_text = escape_sequence_text(ev.message)
                     if ev.participant:
-                        out.append(f"Note over {format_mermaid_name(ev.participant)}: {note_text}")
+                        yield f"Note over {names[ev.participant]}: {note_text}"
                     else:
-                        out.append(f"Note: {note_text}")
-                elif isinstance(ev, AltBlock):
-                    out.extend(process_alt_block(ev))
-                elif isinstance(ev, LoopBlock):
-                    out.append("loop " + format_condition(ev.condition))
-                    out.extend(process_events(ev.events))
-                    out.append("end")
-                elif isinstance(ev, ParBlock):
-                    first_label, first_branch = ev.branches[0]
-                    out.append("par " + format_condition(first_label))
-                    out.extend(process_events(first_branch))
-                    for label, branch in ev.branches[1:]:
-                        out.append("and " + format_condition(label))
-                        out.extend(process_events(branch))
-                    out.append("end")
-            return out
-
-        def process_alt_block(alt_block: AltBlock):
-            out_alt = []
-            first_cond, first_branch = alt_block.alternatives[0]
-            out_alt.append("alt " + format_condition(first_cond))
-            out_alt.extend(process_events(first_branch))
-            for cond, branch in alt_block.alternatives[1:]:
-                out_alt.append("else " + format_condition(cond))
-                out_alt.extend(process_events(branch))
-            out_alt.append("end")
-            return out_alt
+                        yield f"Note: {note_text}"
+                elif isinstance(ev, (AltBlock, LoopBlock, ParBlock)):
+                    stack.append(_block_items(ev))
+                    break
+            else:
+                stack.pop()
 
-        raw_lines = process_events(diagram.events)
-        filtered_lines = self.filter_deactivations(raw_lines)
-        lines.extend(filtered_lines)
-        return "\n".join(lines)
+    def iter_table(self, table: EventTable, names: FormattedNames = None, active: dict = None):
+        """
+        То же, что iter_events, но для колоночной EventTable: строки таблицы
+        обходятся по колонкам, объекты событий не создаются.
+        """
+        if names is None:
+            names = FormattedNames()
+        strings = table.strings
+        # Тексты сообщений и заметок экранируются одним вызовом escape_many;
+        # метки блоков проходят format_condition и в него не попадают
+        positions = [text for kind, text in zip(table.kinds, table.texts) if kind == MESSAGE or kind == NOTE]
+        escaped = [None] * len(strings)
+        for position, safe_text in zip(positions, BaseMermaidGenerator.escape_many(strings[i] for i in positions)):
+            escaped[position] = safe_text
+        # Имена таблицы немногочисленны, поэтому форматируются все сразу
+        formatted = [names[name] for name in table.names]
+        block_keywords = {ALT: "alt ", LOOP: "loop ", PAR: "par ", ELSE: "else ", AND: "and "}
+        for kind, sender, receiver, text in zip(table.kinds, table.senders, table.receivers, table.texts):
+            if kind == MESSAGE:
+                yield f"{formatted[sender]}->>{formatted[receiver]}: {escaped[text]}"
+            elif kind == ACTIVATE or kind == DEACTIVATE:
+                name = formatted[sender]
+                if active is not None:
+                    if kind == DEACTIVATE:
+                        if not active.get(name, False):
+                            continue
+                        active[name] = False
+                    else:
+                        active[name] = True
+                yield ("activate " if kind == ACTIVATE else "deactivate ") + name
+            elif kind == NOTE:
+                note_text = escaped[text]
+                if sender != NO_ID and table.names[sender]:
+                    yield f"Note over {formatted[sender]}: {note_text}"
+                else:
+                    yield f"Note: {note_text}"
+            elif kind == END:
+                yield "end"
+            else:
+                yield block_keywords[kind] + format_condition(strings[text])
 
     def filter_deactivations(self, lines):
+        """
+        Убирает deactivate для неактивных участников из уже готовых строк
+        (например, собранных из отдельно отрендеренных фрагментов).
+        generate() ведёт это состояние сам, см. iter_events(active=...).
+        """
         active = {}
-        result = []
         for line in lines:
             if line.startswith("activate "):
                 part = line.split(" ", 1)[1]
                 active[part] = True
-                result.append(line)
+                yield line
             elif line.startswith("deactivate "):
                 part = line.split(" ", 1)[1]
                 if active.get(part, False):
-                    result.append(line)
+                    yield line
                     active[part] = False
                 else:
                     continue
             else:
-                result.append(line)
-        return result
+                yield line
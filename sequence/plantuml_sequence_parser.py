@@ -1,152 +1,317 @@
 import re
+from sys import intern
 from core.sequence_model import (
     SequenceDiagram, Participant, Actor, Message,
     Activate, Deactivate, Note, AltBlock, LoopBlock, ParBlock
 )
-from core.diagram_parser import DiagramParser
+from core.diagram_parser import DiagramParser, clean_lines
+from core.sequence_table import EventTable
+
+# Сколько готовых событий верхнего уровня копится перед переносом в EventTable
+TABLE_FLUSH_EVENTS = 1024
+
+# Строки, начинающиеся с actor/participant, считаются объявлениями и не попадают в события
+DECLARATION_PREFIX_RE = re.compile(r'^(actor|participant)\s+', re.IGNORECASE)
+DECLARATION_RE = re.compile(r'^(actor|participant)\s+(?:"([^"]+)"\s+as\s+(\w+)|(\w+))$', re.IGNORECASE)
+# Строки, которые могут менять структуру блоков, и объявления
+STRUCTURE_RE = re.compile(r'(?:end|else|and|alt|loop|par|actor\s|participant\s)', re.IGNORECASE)
+MESSAGE_RE = re.compile(r'^(\w+)\s*->>?\s*(\w+)\s*:\s*(.+)$')
+ACTIVATE_RE = re.compile(r'^activate\s+(\w+)$', re.IGNORECASE)
+DEACTIVATE_RE = re.compile(r'^deactivate\s+(\w+)$', re.IGNORECASE)
+NOTE_RE = re.compile(r'^note(?:\s+(?:over|left of|right of))?\s*(\w+)?\s*:\s*(.+)$', re.IGNORECASE)
+
+class _EventBuilder:
+    """
+    Построитель дерева событий, которому строки подаются по одной.
+    Вложенные блоки alt/loop/par хранятся в явном стеке кадров
+    (тип блока, метка текущей ветки, список событий родителя, готовые ветки),
+    поэтому глубина вложенности не ограничена лимитом рекурсии.
+    Попутно в `mentioned` регистрируются имена участников
+    в порядке их первого появления в событиях.
+    Сработавшие правила и нераспознанные строки учитываются в metrics
+    (core.instrumentation.Instrumentation), если он задан.
+    """
+
+    def __init__(self, metrics=None):
+        self.events = []
+        self.mentioned = {}
+        self.metrics = metrics
+        self.done = False
+        self._stack = []
+        # Ветка alt/par, закрытая строкой "end": решение о том, продолжается
+        # ли блок (else/and) или закрывается ещё одним "end", принимается
+        # по следующей строке.
+        self._pending = None
+
+    def feed(self, line: str):
+        lowered = line.lower()
+        if self._pending is not None:
+            kind, _, parent_events, parts = self._pending
+            self._pending = None
+            if self._continue_block(kind, line, lowered, parent_events, parts):
+                return
+            self._close_block(kind, parent_events, parts)
+            if lowered.startswith("end"):
+                return
+
+        while True:
+            # Завершаем блок, если встречаем "end"
+            if lowered.startswith("end"):
+                if not self._stack:
+                    self.done = True
+                    return
+                kind, label, parent_events, parts = self._stack.pop()
+                if kind == "loop":
+                    parent_events.append(LoopBlock(condition=label, events=self.events))
+                    self.events = parent_events
+                else:
+                    parts.append((label, self.events))
+                    self._pending = (kind, label, parent_events, parts)
+                return
+            # Завершаем ветку alt/par, если встречаем "else" или "and"
+            if lowered.startswith("else") or lowered.startswith("and"):
+                if not self._stack:
+                    self.done = True
+                    return
+                kind, label, parent_events, parts = self._stack.pop()
+                if kind == "loop":
+                    parent_events.append(LoopBlock(condition=label, events=self.events))
+                    self.events = parent_events
+                    continue
+                parts.append((label, self.events))
+                if self._continue_block(kind, line, lowered, parent_events, parts):
+                    return
+                self._close_block(kind, parent_events, parts)
+                continue
+            break
+
+        # Alt-блок
+        if lowered.startswith("alt"):
+            self._stack.append(("alt", line[3:].strip(), self.events, []))
+            self.events = []
+            if self.metrics is not None:
+                self.metrics.rule("sequence.alt")
+        # Loop-блок
+        elif lowered.startswith("loop"):
+            self._stack.append(("loop", line[4:].strip(), self.events, None))
+            self.events = []
+            if self.metrics is not None:
+                self.metrics.rule("sequence.loop")
+        # Par-блок
+        elif lowered.startswith("par"):
+            self._stack.append(("par", line[3:].strip(), self.events, []))
+            self.events = []
+            if self.metrics is not None:
+                self.metrics.rule("sequence.par")
+        else:
+            self._add_event(line)
+
+    @property
+    def at_top_level(self) -> bool:
+        return not self._stack and self._pending is None
+
+    def finish(self):
+        """Закрывает все незавершённые блоки (конец ввода) и возвращает события верхнего уровня."""
+        if self._pending is not None:
+            kind, _, parent_events, parts = self._pending
+            self._pending = None
+            self._close_block(kind, parent_events, parts)
+        while self._stack:
+            kind, label, parent_events, parts = self._stack.pop()
+            if kind == "loop":
+                parent_events.append(LoopBlock(condition=label, events=self.events))
+            else:
+                parts.append((label, self.events))
+                self._close_block(kind, parent_events, parts)
+            self.events = parent_events
+        return self.events
+
+    def _continue_block(self, kind, line, lowered, parent_events, parts) -> bool:
+        separator = "else" if kind == "alt" else "and"
+        if not lowered.startswith(separator):
+            return False
+        self._stack.append((kind, line[len(separator):].strip(), parent_events, parts))
+        self.events = []
+        return True
+
+    def _close_block(self, kind, parent_events, parts):
+        if kind == "alt":
+            parent_events.append(AltBlock(alternatives=parts))
+        else:
+            parent_events.append(ParBlock(branches=parts))
+        self.events = parent_events
+
+    def _add_event(self, line: str):
+        mentioned = self.mentioned
+        metrics = self.metrics
+        # Сообщения: поддерживаем как "->" так и "->>"
+        m_msg = MESSAGE_RE.match(line)
+        if m_msg:
+            sender, receiver, msg = m_msg.groups()
+            # Имена интернируются: все события ссылаются на одну строку на участника
+            sender, receiver = intern(sender), intern(receiver)
+            mentioned[sender] = None
+            mentioned[receiver] = None
+            self.events.append(Message(sender=sender, receiver=receiver, message=msg.strip()))
+            if metrics is not None:
+                metrics.rule("sequence.message")
+            return
+        # Активация
+        m_act = ACTIVATE_RE.match(line)
+        if m_act:
+            participant = intern(m_act.group(1))
+            mentioned[participant] = None
+            self.events.append(Activate(participant=participant))
+            if metrics is not None:
+                metrics.rule("sequence.activate")
+            return
+        # Деактивация
+        m_deact = DEACTIVATE_RE.match(line)
+        if m_deact:
+            participant = intern(m_deact.group(1))
+            mentioned[participant] = None
+            self.events.append(Deactivate(participant=participant))
+            if metrics is not None:
+                metrics.rule("sequence.deactivate")
+            return
+        # Заметка (note)
+        m_note = NOTE_RE.match(line)
+        if m_note:
+            participant = m_note.group(1)
+            if participant:
+                participant = intern(participant)
+                mentioned[participant] = None
+            self.events.append(Note(participant=participant, message=m_note.group(2).strip()))
+            if metrics is not None:
+                metrics.rule("sequence.note")
+        elif metrics is not None:
+            metrics.unparsed_line(line)
+
+class _StructureScanner(_EventBuilder):
+    """Повторяет разбор структуры блоков _EventBuilder, не разбирая сами события."""
+
+    def _add_event(self, line: str):
+        pass
+
+    @property
+    def awaiting_next_line(self) -> bool:
+        """True, если блок закрыт "end" и его судьбу решит следующая строка."""
+        return self._pending is not None
+
+    @property
+    def pending_top_level_block(self):
+        """Тип блока верхнего уровня, ожидающего решения после "end", иначе None."""
+        if self._stack or self._pending is None:
+            return None
+        return self._pending[0]
+
+def split_statements(lines) -> list:
+    """
+    Делит очищенные строки на операторы верхнего уровня: объявления,
+    одиночные события и целые блоки alt/loop/par вместе с ветками else/and
+    и закрывающими "end". Каждый оператор разбирается независимо от остальных
+    с тем же результатом, что и в составе всей диаграммы (см. core.incremental).
+    События после "end"/"else"/"and" на верхнем уровне отбрасываются, как и при разборе.
+    """
+    statements = []
+    scanner = _StructureScanner()
+    awaiting = False
+    current = None
+    for line in lines:
+        # Обычное событие без ожидающего решения блока не меняет структуру,
+        # поэтому сканер для него можно не вызывать.
+        if not awaiting and not STRUCTURE_RE.match(line):
+            if scanner.done:
+                continue
+            if current is None:
+                statements.append((line,))
+            else:
+                current.append(line)
+            continue
+        if DECLARATION_PREFIX_RE.match(line):
+            statements.append((line,))
+            continue
+        if scanner.done:
+            continue
+        # Блок верхнего уровня, закрытый "end", продолжается следующей строкой,
+        # только если это else/and той же конструкции или ещё один "end".
+        pending = scanner.pending_top_level_block
+        scanner.feed(line)
+        awaiting = scanner.awaiting_next_line
+        if pending is not None:
+            lowered = line.lower()
+            separator = "else" if pending == "alt" else "and"
+            if lowered.startswith("end") or lowered.startswith(separator):
+                current.append(line)
+                if scanner.at_top_level:
+                    statements.append(tuple(current))
+                    current = None
+                continue
+            statements.append(tuple(current))
+            current = None
+        if scanner.done:
+            continue
+        if current is None:
+            current = [line]
+        else:
+            current.append(line)
+        if scanner.at_top_level:
+            statements.append(tuple(current))
+            current = None
+    if current is not None:
+        statements.append(tuple(current))
+    return statements
 
 class PlantUMLSequenceParser(DiagramParser):
-    def parse(self, plantuml: str) -> SequenceDiagram:
-        # Сначала собираем все строки, удаляя @startuml, @enduml и пустые строки
-        all_lines = [line.strip() for line in plantuml.splitlines() 
-                     if line.strip() and not line.strip().startswith('@')]
-        
-        # Сбор актёров и участников из объявлений
+    def __init__(self, columnar: bool = False):
+        # columnar=True: события возвращаются в колоночной EventTable,
+        # а объекты событий живут только до закрытия блока верхнего уровня.
+        self.columnar = columnar
+
+    def parse_stream(self, lines) -> SequenceDiagram:
+        # Один проход по входу: объявления actor/participant собираются
+        # в словари, остальные строки сразу превращаются в события.
         actors = {}
         participants = {}
-        for line in all_lines:
-            m_actor_alias = re.match(r'^(actor)\s+"([^"]+)"\s+as\s+(\w+)$', line, re.IGNORECASE)
-            if m_actor_alias:
-                _, _, alias = m_actor_alias.groups()
-                actors[alias] = Actor(name=alias)
-                continue
-            m_actor = re.match(r'^(actor)\s+(\w+)$', line, re.IGNORECASE)
-            if m_actor:
-                name = m_actor.group(2)
-                actors[name] = Actor(name=name)
+        metrics = self.instrumentation
+        builder = _EventBuilder(metrics)
+        table = EventTable() if self.columnar else None
+        # Пропускаем @startuml, @enduml и пустые строки
+        for line in clean_lines(lines):
+            if DECLARATION_PREFIX_RE.match(line):
+                m_decl = DECLARATION_RE.match(line)
+                if m_decl:
+                    keyword, _, alias, name = m_decl.groups()
+                    name = intern(alias or name)
+                    if keyword.lower() == "actor":
+                        actors[name] = Actor(name=name)
+                    else:
+                        participants[name] = Participant(name=name)
+                    if metrics is not None:
+                        metrics.rule("sequence.declaration")
+                elif metrics is not None:
+                    metrics.unparsed_line(line)
                 continue
-            m_part_alias = re.match(r'^(participant)\s+"([^"]+)"\s+as\s+(\w+)$', line, re.IGNORECASE)
-            if m_part_alias:
-                _, _, alias = m_part_alias.groups()
-                participants[alias] = Participant(name=alias)
-                continue
-            m_part = re.match(r'^(participant)\s+(\w+)$', line, re.IGNORECASE)
-            if m_part:
-                name = m_part.group(2)
+            # После "end"/"else"/"and" на верхнем уровне события больше не
+            # разбираются, но объявления продолжают собираться.
+            if not builder.done:
+                builder.feed(line)
+                if table is not None and len(builder.events) >= TABLE_FLUSH_EVENTS and builder.at_top_level:
+                    table.extend(builder.events)
+                    builder.events.clear()
+        events = builder.finish()
+        if table is not None:
+            table.extend(events)
+            events = table
+
+        # Участники, встреченные только в событиях (если не объявлены явно),
+        # в порядке первого появления
+        for name in builder.mentioned:
+            if name not in actors and name not in participants:
                 participants[name] = Participant(name=name)
-                continue
-        
-        # Формируем список строк для событий, исключая объявления
-        event_lines = [line for line in all_lines if not re.match(r'^(actor|participant)\s+', line, re.IGNORECASE)]
-        
-        events, _ = self._parse_events(event_lines, 0)
-        
-        # Собираем имена участников из событий (если не добавлены явно)
-        def collect_names(ev_list):
-            for ev in ev_list:
-                if isinstance(ev, Message):
-                    if ev.sender not in actors and ev.sender not in participants:
-                        participants[ev.sender] = Participant(name=ev.sender)
-                    if ev.receiver not in actors and ev.receiver not in participants:
-                        participants[ev.receiver] = Participant(name=ev.receiver)
-                elif isinstance(ev, (Activate, Deactivate)):
-                    if ev.participant not in actors and ev.participant not in participants:
-                        participants[ev.participant] = Participant(name=ev.participant)
-                elif isinstance(ev, Note):
-                    if ev.participant and (ev.participant not in actors and ev.participant not in participants):
-                        participants[ev.participant] = Participant(name=ev.participant)
-                elif isinstance(ev, AltBlock):
-                    for cond, subev in ev.alternatives:
-                        collect_names(subev)
-                elif isinstance(ev, LoopBlock):
-                    collect_names(ev.events)
-                elif isinstance(ev, ParBlock):
-                    for label, branch in ev.branches:
-                        collect_names(branch)
-        collect_names(events)
-        
+
         return SequenceDiagram(
             actors=list(actors.values()),
             participants=list(participants.values()),
             events=events
         )
-    
-    def _parse_events(self, lines, i):
-        events = []
-        while i < len(lines):
-            line = lines[i]
-            # Завершаем блок, если встречаем "end"
-            if line.lower().startswith("end"):
-                return events, i + 1
-            # Завершаем блок alt/par, если встречаем "else" или "and"
-            if line.lower().startswith("else") or line.lower().startswith("and"):
-                return events, i
-            # Alt-блок
-            if line.lower().startswith("alt"):
-                condition = line[3:].strip()
-                i += 1
-                alternatives = []
-                alt_events, i = self._parse_events(lines, i)
-                alternatives.append((condition, alt_events))
-                while i < len(lines) and lines[i].lower().startswith("else"):
-                    condition = lines[i][4:].strip()
-                    i += 1
-                    sub_events, i = self._parse_events(lines, i)
-                    alternatives.append((condition, sub_events))
-                if i < len(lines) and lines[i].lower().startswith("end"):
-                    i += 1
-                events.append(AltBlock(alternatives=alternatives))
-                continue
-            # Loop-блок
-            if line.lower().startswith("loop"):
-                condition = line[4:].strip()
-                i += 1
-                loop_events, i = self._parse_events(lines, i)
-                events.append(LoopBlock(condition=condition, events=loop_events))
-                continue
-            # Par-блок
-            if line.lower().startswith("par"):
-                branch_label = line[3:].strip()
-                i += 1
-                branch_events, i = self._parse_events(lines, i)
-                branches = [(branch_label, branch_events)]
-                while i < len(lines) and lines[i].lower().startswith("and"):
-                    branch_label = lines[i][3:].strip()
-                    i += 1
-                    branch_events, i = self._parse_events(lines, i)
-                    branches.append((branch_label, branch_events))
-                if i < len(lines) and lines[i].lower().startswith("end"):
-                    i += 1
-                events.append(ParBlock(branches=branches))
-                continue
-            # Сообщения: поддерживаем как "->" так и "->>"
-            m_msg = re.match(r'^(\w+)\s*->>?\s*(\w+)\s*:\s*(.+)$', line)
-            if m_msg:
-                sender, receiver, msg = m_msg.groups()
-                events.append(Message(sender=sender, receiver=receiver, message=msg.strip()))
-                i += 1
-                continue
-            # Активация
-            m_act = re.match(r'^activate\s+(\w+)$', line, re.IGNORECASE)
-            if m_act:
-                participant = m_act.group(1)
-                events.append(Activate(participant=participant))
-                i += 1
-                continue
-            # Деактивация
-            m_deact = re.match(r'^deactivate\s+(\w+)$', line, re.IGNORECASE)
-            if m_deact:
-                participant = m_deact.group(1)
-                events.append(Deactivate(participant=participant))
-                i += 1
-                continue
-            # Заметка (note)
-            m_note = re.match(r'^note(?:\s+(?:over|left of|right of))?\s*(\w+)?\s*:\s*(.+)$', line, re.IGNORECASE)
-            if m_note:
-                participant = m_note.group(1)
-                note_text = m_note.group(2).strip()
-                events.append(Note(participant=participant, message=note_text))
-                i += 1
-                continue
-            i += 1
-        return events, i
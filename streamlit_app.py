@@ -1,26 +1,120 @@
+import os
+
 import streamlit as st
-from components.plantuml_components_parser import PlantUMLComponentParser
-from components.mermaid_components_generator import MermaidGenerator
-from classes.plantuml_class_parser import PlantUMLClassParser
-from classes.mermaid_class_generator import MermaidClassGenerator
-from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
-from sequence.mermaid_sequence_generator import MermaidSequenceGenerator
 from resources.image import get_base64_image
+from viewer.plantuml_server import SERVER_URL_ENV, PlantUMLServerClient
 from viewer.plantuml_viewer import PlantUMLRenderer
 from viewer.mermaid_viewer import MermaidRenderer
+from core.conversion_cache import ConversionCache
+from core.diagram_detector import detect_diagram_type
+from core.incremental import IncrementalConverter
+
+# Placeholder diagrams shown in the empty text area
+COMPONENTS_PLACEHOLDER = (
+    '@startuml\n'
+    'component "UI (Compose Screen)" as UI\n'
+    'component "ViewModel\\n(State Holder)" as VM\n'
+    'component "Domain/Repository\\n(Business Logic)" as BL\n\n'
+    'UI --> VM : User events (intent calls)\n'
+    'VM --> BL : Requests data or actions\n'
+    'VM <-- BL : New data/result\n'
+    'UI <-- VM : Updated UI State\n'
+    '@enduml'
+)
+
+CLASS_PLACEHOLDER = (
+    '@startuml\n'
+    'class Customer {\n'
+    '    +int id\n'
+    '    +String name\n'
+    '    +login()\n'
+    '}\n'
+    'class Order {\n'
+    '    +int orderId\n'
+    '    +date orderDate\n'
+    '    +calculateTotal()\n'
+    '}\n'
+    'Customer "1" --> "0..*" Order : places\n'
+    'Customer <|-- VIPCustomer\n'
+    '@enduml'
+)
+
+SEQUENCE_PLACEHOLDER = (
+    '@startuml\n'
+    'actor User\n'
+    'participant "Mobile App" as App\n'
+    'participant "Auth Service" as Auth\n'
+    'participant "Payment Gateway" as Payment\n'
+    'participant "Order Service" as Order\n\n'
+    'User -> App: Login\n'
+    'activate App\n'
+    'App -> Auth: Validate Credentials\n'
+    'alt Valid Credentials\n'
+    '    Auth -> App: Success\n'
+    '    deactivate Auth\n'
+    '    App -> Payment: Initiate Payment\n'
+    '    activate Payment\n'
+    '    alt Payment Approved\n'
+    '         Payment -> Order: Create Order\n'
+    '         activate Order\n'
+    '         Order -> Payment: Confirm Order\n'
+    '         deactivate Order\n'
+    '         Payment -> App: Payment Successful\n'
+    '    else Payment Declined\n'
+    '         Payment -> App: Payment Failed\n'
+    '    end\n'
+    '    deactivate Payment\n'
+    'else Invalid Credentials\n'
+    '    Auth -> App: Failure\n'
+    '    deactivate Auth\n'
+    'end\n'
+    'App -> User: Show Result\n'
+    'deactivate App\n'
+    '@enduml'
+)
+
+# Sidebar options: label -> (diagram kind or None for auto-detection, placeholder text)
+DIAGRAM_OPTIONS = {
+    "🧩 Components": ("components", COMPONENTS_PLACEHOLDER),
+    "📚 Class": ("class", CLASS_PLACEHOLDER),
+    "🔄 Sequence": ("sequence", SEQUENCE_PLACEHOLDER),
+    "🔍 Auto-detect": (None, ""),
+}
+
+@st.cache_data
+def get_logo_html(image_path: str) -> str:
+    """The logo is read and base64-encoded once, not on every rerun."""
+    logo_b64 = get_base64_image(image_path)
+    return (
+        f'<div style="text-align: center;">'
+        f'<img src="data:image/png;base64,{logo_b64}" alt="Logo" width="350">'
+        f'</div>'
+    )
+
+@st.cache_resource
+def get_plantuml_renderer(server_rendering: bool) -> PlantUMLRenderer:
+    return PlantUMLRenderer(get_plantuml_server_client() if server_rendering else None)
+
+@st.cache_resource
+def get_mermaid_renderer() -> MermaidRenderer:
+    return MermaidRenderer()
+
+@st.cache_resource
+def get_conversion_cache() -> ConversionCache:
+    """One in-memory conversion cache shared by all sessions of the server."""
+    return ConversionCache()
+
+@st.cache_resource
+def get_plantuml_server_client() -> PlantUMLServerClient:
+    """Pooled PlantUML server client with an SVG cache, shared by all sessions."""
+    return PlantUMLServerClient()
 
 def main():
     st.set_page_config(page_title="PlantUML to Mermaid Converter", layout="wide")
     
     # Display logo
     try:
-        logo_b64 = get_base64_image("resources/project_logo.png")
-        html_logo = (
-            f'<div style="text-align: center;">'
-            f'<img src="data:image/png;base64,{logo_b64}" alt="Logo" width="350">'
-            f'</div>'
-        )
-        st.markdown(html_logo, unsafe_allow_html=True)
+        st.markdown(get_logo_html("resources/project_logo.png"), unsafe_allow_html=True)
     except Exception as e:
         st.error("Error loading logo: " + str(e))
     
@@ -31,7 +125,7 @@ def main():
     st.sidebar.header("Diagram Settings")
     diagram_type = st.sidebar.selectbox(
         "Select diagram type",
-        ["🧩 Components", "📚 Class", "🔄 Sequence"],
+        list(DIAGRAM_OPTIONS),
         index=0
     )
     st.sidebar.markdown(
@@ -43,73 +137,22 @@ def main():
            the generated Mermaid code and its preview.
         """
     )
+    incremental = st.sidebar.checkbox(
+        "Incremental conversion",
+        value=True,
+        help="Re-convert only the statements and blocks that changed since the previous conversion."
+    )
+    server_rendering = st.sidebar.checkbox(
+        "Render PlantUML on the server",
+        value=SERVER_URL_ENV in os.environ,
+        help=f"Fetch the preview SVG through the app (from ${SERVER_URL_ENV} or the public server) "
+             "and embed it, instead of loading it in the browser."
+    )
+    cache_stats = get_conversion_cache().stats
+    st.sidebar.caption(f"Conversion cache: {cache_stats.hits} hits, {cache_stats.misses} misses")
     
-    # Define placeholder text based on the selected diagram type
-    if "Components" in diagram_type:
-        placeholder_text = (
-            '@startuml\n'
-            'component "UI (Compose Screen)" as UI\n'
-            'component "ViewModel\\n(State Holder)" as VM\n'
-            'component "Domain/Repository\\n(Business Logic)" as BL\n\n'
-            'UI --> VM : User events (intent calls)\n'
-            'VM --> BL : Requests data or actions\n'
-            'VM <-- BL : New data/result\n'
-            'UI <-- VM : Updated UI State\n'
-            '@enduml'
-        )
-    elif "Class" in diagram_type:
-        placeholder_text = (
-            '@startuml\n'
-            'class Customer {\n'
-            '    +int id\n'
-            '    +String name\n'
-            '    +login()\n'
-            '}\n'
-            'class Order {\n'
-            '    +int orderId\n'
-            '    +date orderDate\n'
-            '    +calculateTotal()\n'
-            '}\n'
-            'Customer "1" --> "0..*" Order : places\n'
-            'Customer <|-- VIPCustomer\n'
-            '@enduml'
-        )
-    elif "Sequence" in diagram_type:
-        placeholder_text = (
-            '@startuml\n'
-            'actor User\n'
-            'participant "Mobile App" as App\n'
-            'participant "Auth Service" as Auth\n'
-            'participant "Payment Gateway" as Payment\n'
-            'participant "Order Service" as Order\n\n'
-            'User -> App: Login\n'
-            'activate App\n'
-            'App -> Auth: Validate Credentials\n'
-            'alt Valid Credentials\n'
-            '    Auth -> App: Success\n'
-            '    deactivate Auth\n'
-            '    App -> Payment: Initiate Payment\n'
-            '    activate Payment\n'
-            '    alt Payment Approved\n'
-            '         Payment -> Order: Create Order\n'
-            '         activate Order\n'
-            '         Order -> Payment: Confirm Order\n'
-            '         deactivate Order\n'
-            '         Payment -> App: Payment Successful\n'
-            '    else Payment Declined\n'
-            '         Payment -> App: Payment Failed\n'
-            '    end\n'
-            '    deactivate Payment\n'
-            'else Invalid Credentials\n'
-            '    Auth -> App: Failure\n'
-            '    deactivate Auth\n'
-            'end\n'
-            'App -> User: Show Result\n'
-            'deactivate App\n'
-            '@enduml'
-        )
-    else:
-        placeholder_text = ""
+    # Placeholder text for the selected diagram type (precomputed at import)
+    kind, placeholder_text = DIAGRAM_OPTIONS[diagram_type]
     
     # ------------------------------------------------------------------
     # Top Row: PlantUML Input and Preview
@@ -126,7 +169,7 @@ def main():
             convert_button = st.button("Convert to Mermaid")
         with top_cols[1]:
             st.subheader("PlantUML Diagram Preview")
-            plantuml_renderer = PlantUMLRenderer()
+            plantuml_renderer = get_plantuml_renderer(server_rendering)
             if plantuml_code.strip():
                 plantuml_renderer.render(plantuml_code, 400)
             else:
@@ -138,32 +181,38 @@ def main():
     with st.container():
         bottom_cols = st.columns(2)
         if convert_button and plantuml_code.strip():
-            # Choose the appropriate parser and generator based on diagram type
-            if "Components" in diagram_type:
-                parser = PlantUMLComponentParser()
-                diagram = parser.parse(plantuml_code)
-                generator = MermaidGenerator()
-                mermaid_code = generator.generate(diagram)
-            elif "Class" in diagram_type:
-                parser = PlantUMLClassParser()
-                diagram = parser.parse(plantuml_code)
-                generator = MermaidClassGenerator()
-                mermaid_code = generator.generate(diagram)
-            elif "Sequence" in diagram_type:
-                parser = PlantUMLSequenceParser()
-                diagram = parser.parse(plantuml_code)
-                generator = MermaidSequenceGenerator()
-                mermaid_code = generator.generate(diagram)
-            else:
+            # Results come from the incremental converter or the shared cache
+            if kind is None:
+                kind = detect_diagram_type(plantuml_code)
+                if kind is None:
+                    st.warning("Could not detect the diagram type. Please select it in the sidebar.")
+            if not kind:
                 mermaid_code = ""
-            
+            elif incremental:
+                # The converter keeps the previous version's fragments in session state
+                converter = st.session_state.get("incremental_converter")
+                if converter is None or converter.kind != kind:
+                    converter = IncrementalConverter(kind)
+                    st.session_state["incremental_converter"] = converter
+                mermaid_code = converter.convert(plantuml_code)
+            else:
+                mermaid_code = get_conversion_cache().convert(plantuml_code, kind)
+            # The last result stays on screen across reruns, so the preview
+            # component stays mounted and only re-renders when the code changes
+            st.session_state["mermaid_code"] = mermaid_code
+
+        mermaid_code = st.session_state.get("mermaid_code")
+        if mermaid_code is not None:
             with bottom_cols[0]:
                 st.subheader("Generated Mermaid Code")
                 st.code(mermaid_code, language="mermaid")
             with bottom_cols[1]:
                 st.subheader("Mermaid Diagram Preview")
-                mermaid_renderer = MermaidRenderer()
-                mermaid_renderer.render(mermaid_code, 500)
+                report = get_mermaid_renderer().render(mermaid_code, 500)
+                if report and report.get("error"):
+                    st.error(f"Mermaid could not render the diagram: {report['error']}")
+                elif report and report.get("render_ms") is not None:
+                    st.caption(f"Rendered in {report['render_ms']} ms")
         else:
             with bottom_cols[0]:
                 st.info("Click **Convert to Mermaid** to convert your PlantUML code.")
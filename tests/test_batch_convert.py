@@ -0,0 +1,43 @@
+from cli import batch_convert
+
+DIAGRAM = "@startuml\nA -> B: hello\n@enduml\n"
+
+
+def test_sources_with_the_same_output_fail(tmp_path, capsys):
+    for name in ("a.puml", "a.plantuml", "b.puml"):
+        (tmp_path / name).write_text(DIAGRAM, encoding="utf-8")
+
+    assert batch_convert.main([str(tmp_path), "-j", "1"]) == 1
+
+    errors = capsys.readouterr().err
+    assert f"FAILED {tmp_path / 'a.puml'}" in errors
+    assert f"FAILED {tmp_path / 'a.plantuml'}" in errors
+    assert not (tmp_path / "a.mmd").exists()
+    assert (tmp_path / "b.mmd").exists()
+
+
+def test_source_given_twice_is_converted_once(tmp_path, capsys):
+    (tmp_path / "a.puml").write_text(DIAGRAM, encoding="utf-8")
+
+    assert batch_convert.main([str(tmp_path), str(tmp_path / "a.puml"), "-j", "1"]) == 0
+    assert "Converted 1/1 files" in capsys.readouterr().out
+
+
+def test_failed_generation_leaves_no_partial_output(tmp_path, monkeypatch, capsys):
+    class FailingGenerator:
+        def write(self, diagram, fp):
+            fp.write("sequenceDiagram\n")
+            raise RuntimeError("generator failed")
+
+    (tmp_path / "a.puml").write_text(DIAGRAM, encoding="utf-8")
+    (tmp_path / "b.puml").write_text(DIAGRAM, encoding="utf-8")
+    (tmp_path / "b.mmd").write_text("previous output", encoding="utf-8")
+    parser, _ = batch_convert.get_converter("sequence")
+    monkeypatch.setattr(batch_convert, "get_converter", lambda kind: (parser, FailingGenerator()))
+
+    assert batch_convert.main([str(tmp_path), "-j", "1", "-t", "sequence"]) == 1
+
+    assert "RuntimeError: generator failed" in capsys.readouterr().err
+    assert not (tmp_path / "a.mmd").exists()
+    assert (tmp_path / "b.mmd").read_text(encoding="utf-8") == "previous output"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.puml", "b.mmd", "b.puml"]
@@ -0,0 +1,61 @@
+"""Sequence diagrams nested deeper than the recursion limit are parsed and generated without recursion."""
+import sys
+
+import pytest
+
+from core.sequence_model import LoopBlock
+from sequence.mermaid_sequence_generator import MermaidSequenceGenerator
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+
+DEPTH = 5000
+
+
+def nested_loops(depth: int) -> str:
+    lines = ["@startuml"]
+    for level in range(depth):
+        lines.append(f"loop level {level}")
+        lines.append(f"A -> B: message {level}")
+    lines.extend(["end"] * depth)
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def nested_alts(depth: int) -> str:
+    # Every alt branch is closed by "end"; one more "end" closes the block
+    lines = ["@startuml"]
+    for level in range(depth):
+        lines.append(f"alt case {level}")
+        lines.append(f"A -> B: message {level}")
+    for level in reversed(range(depth)):
+        lines.extend(["end", "else", f"B -> A: fallback {level}", "end", "end"])
+    lines.append("@enduml")
+    return "\n".join(lines)
+
+
+def test_depth_exceeds_recursion_limit():
+    assert DEPTH > sys.getrecursionlimit()
+
+
+@pytest.mark.parametrize("columnar", [False, True], ids=["objects", "columnar"])
+def test_nested_loops(columnar):
+    diagram = PlantUMLSequenceParser(columnar=columnar).parse(nested_loops(DEPTH))
+    if not columnar:
+        depth, events = 0, diagram.events
+        while isinstance(events[-1], LoopBlock):
+            depth, events = depth + 1, events[-1].events
+        assert depth == DEPTH
+
+    lines = MermaidSequenceGenerator().generate(diagram).splitlines()
+    assert sum(line.startswith("loop ") for line in lines) == DEPTH
+    assert lines.count("end") == DEPTH
+    assert sum("->>" in line for line in lines) == DEPTH
+    assert lines[-1] == "end"
+
+
+def test_nested_alt_else():
+    diagram = PlantUMLSequenceParser().parse(nested_alts(DEPTH))
+    lines = MermaidSequenceGenerator().generate(diagram).splitlines()
+    assert sum(line.startswith("alt ") for line in lines) == DEPTH
+    assert sum(line.startswith("else") for line in lines) == DEPTH
+    assert lines.count("end") == DEPTH
+    assert sum("->>" in line for line in lines) == 2 * DEPTH
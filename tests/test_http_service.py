@@ -0,0 +1,99 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cli import http_service
+from cli.http_service import ConversionService, serve
+
+SEQUENCE = "A -> B: hello"
+MERMAID = "sequenceDiagram\nparticipant A\nparticipant B\nA->>B: hello"
+
+
+def run_service(capsys, check, **options):
+    """Runs serve() on a free port with a thread pool and awaits check(port) against it."""
+    async def main():
+        executor = ThreadPoolExecutor(max_workers=2)
+        service = ConversionService(executor, cache_entries=0, **options)
+        stop = asyncio.Event()
+        server = asyncio.ensure_future(serve(service, "127.0.0.1", 0, stop))
+        try:
+            output = ""
+            while "Listening on" not in output:
+                assert not server.done()
+                await asyncio.sleep(0.01)
+                output += capsys.readouterr().out
+            port = int(output.split("Listening on http://", 1)[1].split()[0].rsplit(":", 1)[1])
+            await check(port)
+        finally:
+            stop.set()
+            await server
+            executor.shutdown()
+
+    asyncio.run(main())
+
+
+async def request(port: int, method: str, path: str, body: bytes = None, headers: dict = None):
+    """Sends one request on a new connection; returns (status, JSON payload)."""
+    headers = dict(headers or {})
+    if body is not None:
+        headers.setdefault("Content-Length", str(len(body)))
+    head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nConnection: close\r\n{head}\r\n".encode("latin-1") + (body or b""))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, payload = response.partition(b"\r\n\r\n")
+    return int(status_line.split()[1]), json.loads(payload)
+
+
+def post_json(port: int, path: str, payload):
+    return request(port, "POST", path, json.dumps(payload).encode("utf-8"))
+
+
+def test_convert_and_batch(capsys):
+    async def check(port):
+        assert await request(port, "GET", "/health") == (200, {"status": "ok"})
+        assert await post_json(port, "/convert", {"plantuml": SEQUENCE, "type": "sequence"}) == \
+            (200, {"type": "sequence", "mermaid": MERMAID})
+        status, payload = await post_json(port, "/convert/batch", {"diagrams": [
+            {"id": "a", "plantuml": SEQUENCE, "type": "sequence"},
+            {"id": "b", "plantuml": "not a diagram"},
+        ]})
+        assert status == 200
+        assert payload["results"][0] == {"id": "a", "type": "sequence", "mermaid": MERMAID}
+        assert payload["results"][1]["id"] == "b" and "error" in payload["results"][1]
+
+    run_service(capsys, check)
+
+
+def test_bad_requests(capsys):
+    async def check(port):
+        status, _ = await request(port, "POST", "/convert", b"{not json")
+        assert status == 400
+        status, _ = await request(port, "POST", "/convert", b"[" * 100000 + b"]" * 100000)
+        assert status == 400
+        status, payload = await request(port, "POST", "/convert", b"", {"Content-Length": "-5"})
+        assert (status, payload) == (400, {"error": "invalid Content-Length"})
+        status, _ = await post_json(port, "/convert", {"plantuml": SEQUENCE, "type": "gantt"})
+        assert status == 400
+        # Rejected by the declared length, before the body is read
+        status, _ = await request(port, "POST", "/convert", b"", {"Content-Length": "300001"})
+        assert status == 413
+
+    run_service(capsys, check, max_body_bytes=300000)
+
+
+def test_timeout(capsys, monkeypatch):
+    def slow_convert_task(plantuml, kind):
+        time.sleep(0.5)
+        return kind, "", None
+
+    monkeypatch.setattr(http_service, "convert_task", slow_convert_task)
+
+    async def check(port):
+        status, _ = await post_json(port, "/convert", {"plantuml": SEQUENCE, "type": "sequence"})
+        assert status == 504
+
+    run_service(capsys, check, timeout=0.1)
@@ -0,0 +1,41 @@
+from cli import batch_convert
+from core.manifest import ConversionManifest
+
+DIAGRAM = "@startuml\nA -> B: hello\n@enduml\n"
+
+
+def test_missing_source_is_stale(tmp_path):
+    source = tmp_path / "a.puml"
+    source.write_text(DIAGRAM, encoding="utf-8")
+    missing = tmp_path / "missing.puml"
+    manifest = ConversionManifest(tmp_path / "manifest.json")
+    tasks = [(str(source), str(tmp_path / "a.mmd"), "sequence"),
+             (str(missing), str(tmp_path / "missing.mmd"), "sequence")]
+
+    stale = manifest.stale(tasks)
+
+    assert [item.source for item in stale] == [str(source), str(missing)]
+    assert stale[1].sha256 == "" and stale[1].size == -1
+
+
+def test_runs_from_different_working_directories(tmp_path, monkeypatch, capsys):
+    repo, other = tmp_path / "repo", tmp_path / "other"
+    (repo / "docs").mkdir(parents=True)
+    (other / "docs").mkdir(parents=True)
+    (repo / "docs" / "a.puml").write_text(DIAGRAM, encoding="utf-8")
+    unrelated = other / "docs" / "a.mmd"
+    unrelated.write_text("unrelated", encoding="utf-8")
+
+    monkeypatch.chdir(repo)
+    assert batch_convert.main(["docs", "--manifest", "m.json", "-j", "1"]) == 0
+
+    monkeypatch.chdir(other)
+    argv = ["../repo/docs", "--manifest", "../repo/m.json", "-j", "1"]
+    assert batch_convert.main(argv) == 0
+    assert "Converted 0/0 files" in capsys.readouterr().out
+
+    (repo / "docs" / "a.puml").unlink()
+    assert batch_convert.main(argv) == 0
+    assert "removed outputs of deleted sources: 1" in capsys.readouterr().out
+    assert not (repo / "docs" / "a.mmd").exists()
+    assert unrelated.read_text(encoding="utf-8") == "unrelated"
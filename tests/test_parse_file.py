@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.synthetic import class_diagram, component_diagram, sequence_diagram
+from core.converters import get_converter
+
+SAMPLES = {
+    "components": component_diagram(60, seed=1),
+    "class": class_diagram(60, seed=2),
+    "sequence": sequence_diagram(60, seed=3),
+}
+NEWLINES = {"lf": "\n", "crlf": "\r\n", "cr": "\r", "vt": "\x0b", "line-separator": "\u2028"}
+
+
+@pytest.mark.parametrize("newline", NEWLINES.values(), ids=NEWLINES.keys())
+@pytest.mark.parametrize("kind", SAMPLES)
+def test_parse_file_matches_parse(tmp_path, kind, newline):
+    text = newline.join(SAMPLES[kind].splitlines()) + newline
+    path = tmp_path / "diagram.puml"
+    path.write_bytes(text.encode("utf-8"))
+    parser, _ = get_converter(kind)
+
+    expected = parser.parse(text)
+
+    assert parser.parse_file(path) == expected
+    assert expected == parser.parse(SAMPLES[kind])
@@ -0,0 +1,51 @@
+import zlib
+
+import pytest
+
+from benchmarks.bench_plantuml_encode import legacy_encode64
+from viewer import zoomable
+from viewer.zoomable import decode64, decode_plantuml, encode64, encode_plantuml
+
+TEXTS = [
+    "",
+    "@startuml\nA -> B: hi\n@enduml",
+    "@startuml\nАлиса -> Боб: привет ✓ 日本語 😀\n@enduml",
+    "@startuml\nclass Ünïcödé\n@enduml\n" * 50,
+]
+
+
+def legacy_encode_plantuml(plantuml_text: str) -> str:
+    """encode_plantuml as it was before the table-driven encoder."""
+    return legacy_encode64(zlib.compress(plantuml_text.encode("utf-8"))[2:-4])
+
+
+@pytest.fixture(autouse=True)
+def cold_cache():
+    zoomable._encode_cache.clear()
+    yield
+    zoomable._encode_cache.clear()
+
+
+@pytest.mark.parametrize("length", range(0, 13))
+def test_encode64_matches_legacy_for_every_tail_length(length):
+    data = bytes((i * 37 + 200) % 256 for i in range(length))
+    assert encode64(data) == legacy_encode64(data)
+    # decode64 returns the zero bits of an incomplete group as trailing zero bytes
+    assert decode64(encode64(data))[:length] == data
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_encode_plantuml_matches_legacy(text):
+    assert encode_plantuml(text) == legacy_encode_plantuml(text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_round_trip(text):
+    assert decode_plantuml(encode_plantuml(text)) == text
+    # The memoized result decodes the same way
+    assert decode_plantuml(encode_plantuml(text)) == text
+
+
+def test_inputs_cover_lengths_not_divisible_by_three():
+    tails = {len(zlib.compress(text.encode("utf-8"))[2:-4]) % 3 for text in TEXTS}
+    assert {1, 2} <= tails
@@ -0,0 +1,114 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from viewer.plantuml_server import PlantUMLServerClient, PlantUMLServerError, SVGCache
+from viewer.zoomable import decode_plantuml
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """PlantUML server stub: the diagram text decides the response."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        prefix = "/plantuml/svg/"
+        assert self.path.startswith(prefix)
+        self._answer(decode_plantuml(self.path[len(prefix):]))
+
+    def do_POST(self):
+        assert self.path == "/plantuml/svg"
+        self._answer(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+
+    def _answer(self, text: str):
+        self.server.requests.append((self.command, self.client_address[1]))
+        if "server error" in text:
+            status, content_type = 500, "text/plain"
+        elif "syntax error" in text:
+            status, content_type = 400, "image/svg+xml"
+        elif "bad request" in text:
+            status, content_type = 400, "text/plain"
+        else:
+            status, content_type = 200, "image/svg+xml"
+        body = f"<svg>{len(text)}</svg>".encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(stub_server):
+    client = PlantUMLServerClient(f"http://127.0.0.1:{stub_server.server_address[1]}/plantuml", post_threshold=60)
+    yield client
+    client.close()
+
+
+def test_get_below_threshold_post_above(stub_server, client):
+    short = "@startuml\nA -> B\n@enduml"
+    long = "@startuml\n" + "\n".join(f"A -> B: message {i}" for i in range(50)) + "\n@enduml"
+
+    assert client.svg(short) == f"<svg>{len(short)}</svg>"
+    assert client.svg(long) == f"<svg>{len(long)}</svg>"
+    assert [method for method, _ in stub_server.requests] == ["GET", "POST"]
+
+
+def test_results_are_cached(stub_server, client):
+    client.svg("A -> B")
+    client.svg("A -> B")
+    assert len(stub_server.requests) == 1
+
+
+def test_connection_is_reused(stub_server, client):
+    for i in range(5):
+        client.svg(f"A -> B: {i}")
+    client.svg("A -> B: " + "x" * 100)
+    ports = {port for _, port in stub_server.requests}
+    assert len(stub_server.requests) == 6 and len(ports) == 1
+
+
+def test_error_statuses(client):
+    # Syntax errors are rendered by the server as an SVG with status 400
+    assert client.svg("A -> B: syntax error") == "<svg>20</svg>"
+    with pytest.raises(PlantUMLServerError, match="HTTP 400"):
+        client.svg("A -> B: bad request")
+    with pytest.raises(PlantUMLServerError, match="HTTP 500"):
+        client.svg("A -> B: server error")
+    assert client.cache.get("A -> B: server error") is None
+
+
+def test_cache_ttl_expiry():
+    now = [0.0]
+    cache = SVGCache(max_entries=4, ttl=10.0, clock=lambda: now[0])
+    cache.put("a", "<svg/>")
+    now[0] = 9.9
+    assert cache.get("a") == "<svg/>"
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    cache = SVGCache(max_entries=2, ttl=60.0)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
@@ -0,0 +1,64 @@
+from cli import rewrite_docs
+from cli.rewrite_docs import RewriteStats, rewrite_lines
+
+PLANTUML = "@startuml\nA -> B: hello\n@enduml\n"
+MERMAID = "sequenceDiagram\nparticipant A\nparticipant B\nA->>B: hello\n"
+
+
+def rewrite(text: str, stats: RewriteStats = None) -> str:
+    return "".join(rewrite_lines(text.splitlines(keepends=True), stats or RewriteStats()))
+
+
+def test_markdown_block():
+    stats = RewriteStats()
+    assert rewrite(f"# Title\n```plantuml\n{PLANTUML}```\ntail\n", stats) == f"# Title\n```mermaid\n{MERMAID}```\ntail\n"
+    assert stats.blocks == 1 and not stats.failed
+
+
+def test_asciidoc_block():
+    assert rewrite(f"[plantuml]\n----\n{PLANTUML}----\n") == f"[mermaid]\n----\n{MERMAID}----\n"
+
+
+def test_attribute_line_before_a_fence_is_kept():
+    text = "intro\n[plantuml]\n```\ncode\n```\n"
+    assert rewrite(text) == text
+    assert rewrite(f"[source,plantuml]\n```plantuml\n{PLANTUML}```\n") == \
+        f"[source,plantuml]\n```mermaid\n{MERMAID}```\n"
+
+
+def test_other_fences_are_copied_verbatim():
+    text = f"````markdown\n```plantuml\n{PLANTUML}```\n````\n~~~python\nprint(1)\n~~~\n"
+    stats = RewriteStats()
+    assert rewrite(text, stats) == text
+    assert stats.blocks == 0
+
+
+def test_indented_list_fence():
+    text = "1. Step\n\n   ```puml\n   @startuml\n   A -> B: hello\n   @enduml\n   ```\n"
+    expected = "1. Step\n\n   ```mermaid\n" + "".join(f"   {line}\n" for line in MERMAID.splitlines()) + "   ```\n"
+    assert rewrite(text) == expected
+
+
+def test_unterminated_block_is_kept():
+    text = f"intro\n```plantuml\n{PLANTUML}"
+    stats = RewriteStats()
+    assert rewrite(text, stats) == text
+    assert stats.blocks == 1 and stats.failed[0] == (2, "the block is not closed")
+
+
+def test_crlf_line_endings():
+    text = f"```plantuml\n{PLANTUML}```\n".replace("\n", "\r\n")
+    assert rewrite(text) == f"```mermaid\n{MERMAID}```\n".replace("\n", "\r\n")
+
+
+def test_output_dir_leaves_sources_untouched(tmp_path):
+    docs, out = tmp_path / "docs", tmp_path / "out"
+    (docs / "guide").mkdir(parents=True)
+    source = docs / "guide" / "a.md"
+    original = f"# A\n```plantuml\n{PLANTUML}```\n"
+    source.write_bytes(original.encode("utf-8"))
+
+    assert rewrite_docs.main([str(docs), "-o", str(out), "-j", "1"]) == 0
+
+    assert source.read_bytes() == original.encode("utf-8")
+    assert (out / "guide" / "a.md").read_text(encoding="utf-8") == f"# A\n```mermaid\n{MERMAID}```\n"
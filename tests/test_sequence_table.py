@@ -0,0 +1,34 @@
+from core.sequence_table import ALT, ELSE, END, LOOP, MESSAGE, NO_ID, EventTable
+from sequence.plantuml_sequence_parser import PlantUMLSequenceParser
+
+DIAGRAM = """@startuml
+A -> B: before
+loop retry
+alt ok
+B -> A: done
+else failed
+B -> A: error
+end
+end
+end
+@enduml"""
+
+
+def test_block_rows_share_the_depth_of_their_opening():
+    table = PlantUMLSequenceParser(columnar=True).parse(DIAGRAM).events
+    rows = list(zip(table.kinds, table.depths, table.parents))
+    assert rows == [
+        (MESSAGE, 0, NO_ID),
+        (LOOP, 0, NO_ID),
+        (ALT, 1, 1),
+        (MESSAGE, 2, 2),
+        (ELSE, 1, 2),
+        (MESSAGE, 2, 2),
+        (END, 1, 2),
+        (END, 0, 1),
+    ]
+
+
+def test_round_trip():
+    diagram = PlantUMLSequenceParser().parse(DIAGRAM)
+    assert EventTable.from_events(diagram.events).to_events() == diagram.events
@@ -0,0 +1,42 @@
+"""Shared converters and a shared ConversionCache give single-threaded results under thread interleaving."""
+import sys
+
+import pytest
+
+from benchmarks.bench_threads import corpus, stress
+from core.conversion_cache import ConversionCache
+from core.converters import convert
+
+THREADS = 8
+ROUNDS = 2
+DIAGRAMS = 12
+SIZE = 40
+
+
+@pytest.fixture(scope="module")
+def diagrams():
+    items = corpus(SIZE, DIAGRAMS)
+    return items, [convert(text, kind) for kind, text in items]
+
+
+@pytest.fixture(autouse=True)
+def frequent_switches():
+    # Switch threads as often as possible to expose shared mutable state
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(switch_interval)
+
+
+def test_convert_is_reentrant(diagrams):
+    items, expected = diagrams
+    _, mismatches = stress(THREADS, ROUNDS, items, expected, convert)
+    assert mismatches == 0
+
+
+def test_shared_cache_is_reentrant(diagrams):
+    items, expected = diagrams
+    # Smaller than the corpus: evictions race too
+    cache = ConversionCache(max_entries=DIAGRAMS // 2)
+    _, mismatches = stress(THREADS, ROUNDS, items, expected, cache.convert)
+    assert mismatches == 0
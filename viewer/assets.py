@@ -0,0 +1,162 @@
+"""
+JavaScript assets of the diagram previews (Mermaid and Panzoom).
+
+Two modes, selected with the DIAGRAM_ASSET_MODE environment variable:
+  cdn   (default) - pinned versions loaded from jsdelivr/unpkg;
+  local - the same pinned versions served from static/vendor by a small
+          asset server started once per process. File names contain the
+          version, so responses are marked immutable and every preview
+          iframe after the first one loads them from the browser cache.
+          Works without internet access (air-gapped deployments).
+
+The asset server listens on 127.0.0.1 on a free port, so several app
+processes do not collide and the files are not exposed on other
+interfaces; previews then load only in a browser on the same machine.
+For remote viewers, fix the port with DIAGRAM_ASSET_PORT, publish it
+(a reverse proxy, or DIAGRAM_ASSET_HOST=0.0.0.0) and set
+DIAGRAM_ASSET_URL to the address under which browsers reach it.
+
+Streamlit's own static file serving is not used: it serves .js files as
+text/plain with nosniff, so browsers refuse to execute them.
+
+Usage:
+    python -m viewer.assets download   # fetch the pinned copies into static/vendor
+"""
+import sys
+import threading
+import urllib.request
+from dataclasses import dataclass
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from os import environ
+from pathlib import Path
+
+ASSET_MODE_ENV = "DIAGRAM_ASSET_MODE"
+ASSET_HOST_ENV = "DIAGRAM_ASSET_HOST"
+ASSET_PORT_ENV = "DIAGRAM_ASSET_PORT"
+# Address of the asset server as seen by the browser (e.g. behind a reverse proxy)
+ASSET_URL_ENV = "DIAGRAM_ASSET_URL"
+CDN_MODE = "cdn"
+LOCAL_MODE = "local"
+DEFAULT_ASSET_HOST = "127.0.0.1"
+WILDCARD_HOSTS = ("", "0.0.0.0", "::")
+# 0: a free port picked by the OS
+DEFAULT_ASSET_PORT = 0
+VENDOR_DIR = Path(__file__).resolve().parent.parent / "static" / "vendor"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass(frozen=True)
+class Asset:
+    name: str
+    version: str
+    cdn_url: str
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}-{self.version}.min.js"
+
+
+PINNED_ASSETS = {
+    "mermaid": Asset("mermaid", "11.4.1", "https://cdn.jsdelivr.net/npm/mermaid@11.4.1/dist/mermaid.min.js"),
+    "panzoom": Asset("panzoom", "4.5.1", "https://unpkg.com/@panzoom/panzoom@4.5.1/dist/panzoom.min.js"),
+}
+
+
+class _AssetHandler(SimpleHTTPRequestHandler):
+    """Serves only the pinned vendor files, with long-lived caching headers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(VENDOR_DIR), **kwargs)
+
+    def send_head(self):
+        allowed = {asset.filename for asset in PINNED_ASSETS.values()}
+        if self.path.lstrip("/") not in allowed:
+            self.send_error(404)
+            return None
+        return super().send_head()
+
+    def end_headers(self):
+        self.send_header("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        # Previews are rendered in srcdoc iframes of another origin
+        self.send_header("Access-Control-Allow-Origin", "*")
+        super().end_headers()
+
+    def guess_type(self, path):
+        return "application/javascript"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class AssetServer:
+    """HTTP server for the vendor directory, running in a daemon thread."""
+
+    def __init__(self, host: str = DEFAULT_ASSET_HOST, port: int = DEFAULT_ASSET_PORT):
+        self._server = ThreadingHTTPServer((host, port), _AssetHandler)
+        self._server.daemon_threads = True
+        self.host = host
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def asset_mode() -> str:
+    mode = environ.get(ASSET_MODE_ENV, CDN_MODE).lower()
+    if mode not in (CDN_MODE, LOCAL_MODE):
+        raise ValueError(f"Unknown {ASSET_MODE_ENV}: {mode!r}, expected {CDN_MODE!r} or {LOCAL_MODE!r}")
+    return mode
+
+
+def ensure_asset_server() -> AssetServer:
+    """Starts the asset server on first use; later calls return the same instance."""
+    global _server  # pylint: disable=global-statement
+    with _server_lock:
+        if _server is None:
+            missing = [a.filename for a in PINNED_ASSETS.values() if not (VENDOR_DIR / a.filename).is_file()]
+            if missing:
+                raise FileNotFoundError(
+                    f"Missing vendor assets {', '.join(missing)} in {VENDOR_DIR}; "
+                    f"run `python -m viewer.assets download`"
+                )
+            _server = AssetServer(host=environ.get(ASSET_HOST_ENV, DEFAULT_ASSET_HOST),
+                                  port=int(environ.get(ASSET_PORT_ENV, DEFAULT_ASSET_PORT)))
+        return _server
+
+
+def asset_urls(mode: str = None) -> dict:
+    """Returns {asset name: script URL} for the given (or configured) mode."""
+    mode = mode or asset_mode()
+    if mode == CDN_MODE:
+        return {name: asset.cdn_url for name, asset in PINNED_ASSETS.items()}
+    server = ensure_asset_server()
+    base_url = environ.get(ASSET_URL_ENV)
+    if not base_url:
+        # A wildcard address is not something a browser can connect to
+        host = DEFAULT_ASSET_HOST if server.host in WILDCARD_HOSTS else server.host
+        if ":" in host:
+            host = f"[{host}]"
+        base_url = f"http://{host}:{server.port}"
+    return {name: f"{base_url.rstrip('/')}/{asset.filename}" for name, asset in PINNED_ASSETS.items()}
+
+
+def download_assets(dest: Path = VENDOR_DIR):
+    dest.mkdir(parents=True, exist_ok=True)
+    for asset in PINNED_ASSETS.values():
+        with urllib.request.urlopen(asset.cdn_url, timeout=60) as response:
+            data = response.read()
+        (dest / asset.filename).write_bytes(data)
+        print(f"{asset.filename}: {len(data):,} bytes")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["download"]:
+        sys.exit(__doc__)
+    download_assets()
@@ -0,0 +1,31 @@
+import hashlib
+from pathlib import Path
+
+import streamlit.components.v1 as components
+from viewer.assets import asset_urls
+
+FRONTEND_DIR = Path(__file__).resolve().parent / "frontend" / "mermaid_live"
+DEFAULT_DEBOUNCE_MS = 150
+
+_mermaid_live = components.declare_component("mermaid_live", path=str(FRONTEND_DIR))
+
+def mermaid_live(mermaid_code: str, height: int, key: str = "mermaid-live",
+                 debounce_ms: int = DEFAULT_DEBOUNCE_MS):
+    """
+    Displays a Mermaid diagram in a persistent component: with the same key the
+    iframe stays mounted across reruns, and new code is rendered in place with
+    mermaid.render (debounced, skipped when the code hash is unchanged), keeping
+    the zoom state.
+    Returns the last render report sent back by the browser:
+    {"hash": ..., "render_ms": ..., "error": ...}, or None before the first render.
+    """
+    code_hash = hashlib.sha256(mermaid_code.encode("utf-8")).hexdigest()
+    return _mermaid_live(
+        code=mermaid_code,
+        code_hash=code_hash,
+        height=height,
+        debounce_ms=debounce_ms,
+        assets=asset_urls(),
+        key=key,
+        default=None,
+    )
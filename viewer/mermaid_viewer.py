@@ -1,8 +1,7 @@
-import streamlit.components.v1 as components
 from viewer.renderer import DiagramRenderer
-from viewer.zoomable import zoomable_mermaid_html
+from viewer.mermaid_live import mermaid_live
 
 class MermaidRenderer(DiagramRenderer):
     def render(self, mermaid_code: str, height: int):
-        html = zoomable_mermaid_html(mermaid_code, "mermaid-container", height)
-        components.html(html, height=height, scrolling=True)
+        # Persistent component: re-renders in place instead of rebuilding the iframe
+        return mermaid_live(mermaid_code, height, key="mermaid-container")
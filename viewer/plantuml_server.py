@@ -0,0 +1,174 @@
+"""
+Server-side PlantUML rendering: fetches SVG from a PlantUML server through a
+small pool of keep-alive connections and caches the results, so the preview
+can inline the SVG instead of making every browser fetch it.
+
+The server is taken from the PLANTUML_SERVER_URL environment variable
+(default: the public server), e.g. http://localhost:8080 for a local
+plantuml-server container.
+"""
+import http.client
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from viewer.zoomable import encode_plantuml
+
+SERVER_URL_ENV = "PLANTUML_SERVER_URL"
+DEFAULT_SERVER_URL = "https://www.plantuml.com/plantuml"
+# Encoded diagrams longer than this are sent as a POST body, since long
+# GET URLs are rejected by many servers and proxies.
+POST_THRESHOLD = 4000
+DEFAULT_CACHE_ENTRIES = 128
+DEFAULT_CACHE_TTL = 600.0
+
+
+class PlantUMLServerError(Exception):
+    """The PlantUML server could not render the diagram."""
+
+
+class SVGCache:
+    """
+    LRU cache with a time-to-live: entries older than ttl seconds are
+    treated as missing, and at most max_entries are kept.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, ttl: float = DEFAULT_CACHE_TTL,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections to one host. Idle connections are reused
+    up to `size`; a request that fails on a reused connection (the server
+    may have closed it) is retried once on a fresh one.
+    """
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 10.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported PlantUML server URL: {base_url!r}")
+        self._connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def request(self, method: str, path: str, body: bytes = None, headers=None):
+        """Sends a request and returns (status, content type, body)."""
+        try:
+            connection = self._idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            connection = self._new_connection()
+            reused = False
+        try:
+            return self._send(connection, method, path, body, headers)
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            if not reused:
+                raise
+        connection = self._new_connection()
+        try:
+            return self._send(connection, method, path, body, headers)
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            raise
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _new_connection(self):
+        return self._connection_class(self._host, self._port, timeout=self._timeout)
+
+    def _send(self, connection, method, path, body, headers):
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        data = response.read()
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+        return response.status, response.getheader("Content-Type", ""), data
+
+
+class PlantUMLServerClient:
+    """
+    Renders PlantUML text to SVG on a PlantUML server. Results are cached
+    by the encoded diagram (see encode_plantuml) in an SVGCache.
+    Thread-safe, so one client can be shared by all Streamlit sessions.
+    """
+
+    def __init__(self, base_url: str = None, pool_size: int = 4, timeout: float = 10.0,
+                 cache_entries: int = DEFAULT_CACHE_ENTRIES, cache_ttl: float = DEFAULT_CACHE_TTL,
+                 post_threshold: int = POST_THRESHOLD):
+        self.base_url = (base_url or os.environ.get(SERVER_URL_ENV) or DEFAULT_SERVER_URL).rstrip("/")
+        self.post_threshold = post_threshold
+        self.cache = SVGCache(cache_entries, cache_ttl)
+        self._path = urlsplit(self.base_url).path
+        self._pool = ConnectionPool(self.base_url, pool_size, timeout)
+
+    def svg(self, plantuml_text: str) -> str:
+        encoded = encode_plantuml(plantuml_text)
+        svg = self.cache.get(encoded)
+        if svg is not None:
+            return svg
+        if len(encoded) <= self.post_threshold:
+            status, content_type, body = self._pool.request("GET", f"{self._path}/svg/{encoded}")
+        else:
+            status, content_type, body = self._pool.request(
+                "POST", f"{self._path}/svg", plantuml_text.encode("utf-8"),
+                {"Content-Type": "text/plain; charset=utf-8"}
+            )
+        # Syntax errors come back as HTTP 400 with an SVG picture of the error
+        if status != 200 and not (status == 400 and content_type.startswith("image/svg")):
+            raise PlantUMLServerError(f"PlantUML server returned HTTP {status}")
+        svg = body.decode("utf-8")
+        self.cache.put(encoded, svg)
+        return svg
+
+    def close(self):
+        self._pool.close()
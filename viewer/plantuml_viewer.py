@@ -1,8 +1,24 @@
+import http.client
+
+import streamlit as st
 import streamlit.components.v1 as components
 from viewer.renderer import DiagramRenderer
+from viewer.plantuml_server import PlantUMLServerClient, PlantUMLServerError
 from viewer.zoomable import zoomable_plantuml_html
 
 class PlantUMLRenderer(DiagramRenderer):
+    def __init__(self, server_client: PlantUMLServerClient = None):
+        # With a server client the SVG is fetched server-side and inlined,
+        # otherwise the browser loads it from the public PlantUML server.
+        self.server_client = server_client
+
     def render(self, plantuml_code: str, height: int):
-        html = zoomable_plantuml_html(plantuml_code, "plantuml-container", height)
+        svg = None
+        if self.server_client is not None:
+            try:
+                svg = self.server_client.svg(plantuml_code)
+            except (PlantUMLServerError, http.client.HTTPException, OSError) as e:
+                st.error(f"PlantUML server error: {e}")
+                return
+        html = zoomable_plantuml_html(plantuml_code, "plantuml-container", height, svg)
         components.html(html, height=height, scrolling=True)
@@ -1,84 +1,101 @@
+import base64
+import hashlib
+import threading
 import zlib
+from collections import OrderedDict
+
+from viewer.assets import asset_urls
+
+# Standard Base64 alphabet (with "=" padding) remapped to the PlantUML one.
+# PlantUML fills incomplete groups with zero bits instead of padding, and the
+# zero digit is "0", so "=" maps to "0".
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_PLANTUML_ALPHABET = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_0"
+_TO_PLANTUML = bytes.maketrans(_BASE64_ALPHABET, _PLANTUML_ALPHABET)
+_FROM_PLANTUML = bytes.maketrans(_PLANTUML_ALPHABET[:-1], _BASE64_ALPHABET[:-1])
+
+# Reports the preview load time (navigation start to the load event) in the
+# browser console, to compare asset modes (see viewer.assets).
+LOAD_TIME_SCRIPT = """<script>
+          window.addEventListener("load", () => {
+            console.info(`diagram preview loaded in ${Math.round(performance.now())} ms`);
+          });
+        </script>"""
+
+# encode_plantuml runs on every Streamlit rerun, so results are memoized
+# by the SHA-256 of the text in a small LRU cache.
+ENCODE_CACHE_SIZE = 64
+_encode_cache = OrderedDict()
+_encode_lock = threading.Lock()
 
 def encode_plantuml(plantuml_text: str) -> str:
     """
     Encodes PlantUML text into a format suitable for building a URL
-    to a public PlantUML server.
+    to a public PlantUML server. Results are memoized by content hash.
     """
-    compressed = zlib.compress(plantuml_text.encode("utf-8"))
-    compressed = compressed[2:-4]
-    return encode64(compressed)
+    data = plantuml_text.encode("utf-8")
+    key = hashlib.sha256(data).digest()
+    with _encode_lock:
+        encoded = _encode_cache.get(key)
+        if encoded is not None:
+            _encode_cache.move_to_end(key)
+            return encoded
+    # Raw DEFLATE stream: the same bytes as zlib.compress() without
+    # the 2-byte header and the 4-byte Adler-32 trailer.
+    compressor = zlib.compressobj(-1, zlib.DEFLATED, -zlib.MAX_WBITS)
+    encoded = encode64(compressor.compress(data) + compressor.flush())
+    with _encode_lock:
+        _encode_cache[key] = encoded
+        while len(_encode_cache) > ENCODE_CACHE_SIZE:
+            _encode_cache.popitem(last=False)
+    return encoded
+
+def decode_plantuml(encoded: str) -> str:
+    """Decodes text produced by encode_plantuml back into PlantUML source."""
+    return zlib.decompress(decode64(encoded), -zlib.MAX_WBITS).decode("utf-8")
 
 def encode64(data: bytes) -> str:
     """
     Custom Base64 encoding for PlantUML using the alphabet:
     "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_"
+    Every group of 3 bytes (zero-filled at the end) becomes 4 characters.
+    """
+    return base64.b64encode(data).translate(_TO_PLANTUML).decode("ascii")
+
+def decode64(text: str) -> bytes:
+    """
+    Inverse of encode64. The zero bits that filled the last group come back
+    as trailing zero bytes, which the DEFLATE decoder ignores.
     """
-    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_"
-    
-    def encode6bit(b: int) -> str:
-        if b < 10:
-            return chr(48 + b)
-        b -= 10
-        if b < 26:
-            return chr(65 + b)
-        b -= 26
-        if b < 26:
-            return chr(97 + b)
-        b -= 26
-        if b == 0:
-            return '-'
-        elif b == 1:
-            return '_'
-        else:
-            raise Exception("Invalid value for 6-bit encoding")
-    
-    res = []
-    i = 0
-    length = len(data)
-    while i < length:
-        if i + 3 <= length:
-            b1, b2, b3 = data[i], data[i+1], data[i+2]
-            i += 3
-        elif i + 2 == length:
-            b1, b2 = data[i], data[i+1]
-            b3 = 0
-            i += 2
-        else:
-            b1 = data[i]
-            b2 = 0
-            b3 = 0
-            i += 1
-        
-        c1 = b1 >> 2
-        c2 = ((b1 & 0x3) << 4) | (b2 >> 4)
-        c3 = ((b2 & 0xF) << 2) | (b3 >> 6)
-        c4 = b3 & 0x3F
-        
-        res.append(alphabet[c1])
-        res.append(alphabet[c2])
-        res.append(alphabet[c3])
-        res.append(alphabet[c4])
-    return "".join(res)
+    return base64.b64decode(text.encode("ascii").translate(_FROM_PLANTUML), validate=True)
 
-def zoomable_plantuml_html(plantuml_code: str, container_id: str, height: int) -> str:
+def zoomable_plantuml_html(plantuml_code: str, container_id: str, height: int, svg: str = None,
+                           assets: dict = None) -> str:
     """
     Returns an HTML document that displays a PlantUML diagram (rendered as an image)
     wrapped in a container with pan and zoom functionality.
+    If svg is given (rendered server-side, see viewer.plantuml_server),
+    it is inlined instead of an image loaded by the browser.
+    Script URLs come from assets (see viewer.assets.asset_urls).
     """
-    encoded = encode_plantuml(plantuml_code)
-    plantuml_url = f"http://www.plantuml.com/plantuml/svg/{encoded}"
-    img_tag = (
-        f'<img src="{plantuml_url}" alt="PlantUML Diagram" '
-        f'style="width: auto; display: block; margin: auto;" />'
-    )
+    assets = assets or asset_urls()
+    if svg is not None:
+        img_tag = svg
+    else:
+        encoded = encode_plantuml(plantuml_code)
+        plantuml_url = f"http://www.plantuml.com/plantuml/svg/{encoded}"
+        img_tag = (
+            f'<img src="{plantuml_url}" alt="PlantUML Diagram" '
+            f'style="width: auto; display: block; margin: auto;" />'
+        )
     return f"""
     <!DOCTYPE html>
     <html>
       <head>
         <meta charset="UTF-8">
         <!-- Load Panzoom library -->
-        <script src="https://unpkg.com/@panzoom/panzoom/dist/panzoom.min.js"></script>
+        <script src="{assets['panzoom']}"></script>
+        {LOAD_TIME_SCRIPT}
         <style>
           #{container_id} {{
             width: 100%;
@@ -106,19 +123,22 @@ def zoomable_plantuml_html(plantuml_code: str, container_id: str, height: int) -
     </html>
     """
 
-def zoomable_mermaid_html(mermaid_code: str, container_id: str, height: int) -> str:
+def zoomable_mermaid_html(mermaid_code: str, container_id: str, height: int, assets: dict = None) -> str:
     """
     Returns an HTML document that displays a Mermaid diagram wrapped in a container
     with pan and zoom functionality.
+    Script URLs come from assets (see viewer.assets.asset_urls).
     """
+    assets = assets or asset_urls()
     return f"""
     <!DOCTYPE html>
     <html>
       <head>
         <meta charset="UTF-8">
-        <!-- Load Mermaid and Panzoom libraries from CDN -->
-        <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
-        <script src="https://unpkg.com/@panzoom/panzoom/dist/panzoom.min.js"></script>
+        <!-- Load Mermaid and Panzoom libraries (CDN or local asset server) -->
+        <script src="{assets['mermaid']}"></script>
+        <script src="{assets['panzoom']}"></script>
+        {LOAD_TIME_SCRIPT}
         <script>
           mermaid.initialize({{ startOnLoad: true, securityLevel: 'loose' }});
         </script>